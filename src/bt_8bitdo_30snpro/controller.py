@@ -1,13 +1,42 @@
+import asyncio
 import glob
+import math
 import os
 import struct
-from typing import Callable, Optional
+import time
+import weakref
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Button and axis order used by ControllerState
+BUTTON_NAMES = (
+    "a", "b", "x", "y", "lb", "rb", "lt", "rt", "select", "start", "home",
+    "left_stick", "right_stick", "capture",
+)
+AXIS_NAMES = ("left_x", "left_y", "right_x", "right_y", "dpad_x", "dpad_y")
+AXIS_INDEX = {name: i for i, name in enumerate(AXIS_NAMES)}
+_BUTTON_BIT = {name: i for i, name in enumerate(BUTTON_NAMES)}
+_AXIS_PREFIX = {
+    "left_stick_callbacks": "left",
+    "right_stick_callbacks": "right",
+    "dpad_callbacks": "dpad",
+}
 
 
 def _noop(value: int) -> None:
     pass
 
 
+def _wake(waiter: "asyncio.Future") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def is_controller_name(name: str) -> bool:
+    """Whether a sysfs input device name looks like an 8BitDo SN30 Pro."""
+    name = name.strip().lower()
+    return "8bitdo" in name or "sn30" in name or "pro controller" in name
+
+
 def find_controller_device() -> Optional[str]:
     """Auto-detect the controller device path.
 
@@ -23,8 +52,8 @@ def find_controller_device() -> Optional[str]:
     for sysfs in sorted(glob.glob("/sys/class/input/event*/device/name")):
         try:
             with open(sysfs) as f:
-                name = f.read().strip().lower()
-            if "8bitdo" in name or "sn30" in name or "pro controller" in name:
+                name = f.read()
+            if is_controller_name(name):
                 event_dev = "/dev/input/" + sysfs.split("/")[4]
                 if os.path.exists(event_dev):
                     return event_dev
@@ -39,7 +68,145 @@ def find_controller_device() -> Optional[str]:
     return None
 
 
-class StickCallbacks:
+class InputEvent(NamedTuple):
+    """One decoded device event.
+
+    ``time`` is in seconds: the kernel timestamp for evdev devices, the
+    driver's millisecond counter for joystick devices. ``code`` is the
+    evdev code or the joystick axis/button number.
+    """
+
+    time: float
+    type: int
+    code: int
+    value: int
+
+
+class ControllerState(NamedTuple):
+    """Immutable snapshot of the controller, replaced whole once per input frame.
+
+    Times are device timestamps in seconds, except ``received`` which is
+    time.monotonic() when the snapshot was published; ``received - time``
+    maps device time onto the local monotonic clock. ``directions`` are the
+    digital directions of the axes: the sign for the d-pad, and for the
+    analog sticks the output of the controller's stick filter, so noise
+    around the deadzone doesn't flip them.
+    """
+
+    frame: int
+    time: float
+    received: float
+    buttons: int                   # bit i set while BUTTON_NAMES[i] is held
+    axes: Tuple[int, ...]          # raw values in AXIS_NAMES order
+    directions: Tuple[int, ...]    # -1, 0 or 1 per axis, sticks filtered
+    pressed_at: Tuple[float, ...]  # when each button was last pressed
+    moved_at: Tuple[float, ...]    # when each axis's direction last changed
+
+    def held(self, button: str) -> bool:
+        return bool(self.buttons >> _BUTTON_BIT[button] & 1)
+
+    def direction(self, axis: str) -> int:
+        """-1, 0 or 1 for the digital direction of an axis."""
+        return self.directions[AXIS_INDEX[axis]]
+
+
+EMPTY_STATE = ControllerState(
+    0, 0.0, 0.0, 0, (0,) * len(AXIS_NAMES), (0,) * len(AXIS_NAMES),
+    (0.0,) * len(BUTTON_NAMES), (0.0,) * len(AXIS_NAMES),
+)
+
+
+class StickFilter(NamedTuple):
+    """Digital emulation settings for an analog stick.
+
+    The stick engages once it leaves the radial ``deadzone`` and disengages
+    when it falls back under ``release`` (both fractions of full scale). An
+    axis direction is pressed past ``deadzone`` and held until the axis
+    drops below ``release``, so noise around a threshold can't chatter.
+    With ``digital`` callbacks fire only on press/release edges; otherwise
+    magnitude updates follow while pressed, at most ``max_rate`` per second
+    per axis. Edges are never rate limited.
+    """
+
+    deadzone: float = 0.35
+    release: float = 0.25
+    digital: bool = True
+    max_rate: Optional[float] = None
+    axis_max: int = 32767
+
+
+DEFAULT_STICK_FILTER = StickFilter()
+
+
+class _StickGate:
+    """Filter state for one analog stick, shared by its x and y handlers.
+
+    Without ``callbacks`` the gate only tracks ``directions``, as the
+    controller does for its state snapshot.
+    """
+
+    def __init__(self, callbacks: Optional["StickCallbacks"], config: StickFilter):
+        self.values = [0, 0]
+        self.directions = [0, 0]
+        self.sent = [0.0, 0.0]
+        self.engaged = False
+        self.press = config.deadzone * config.axis_max
+        self.release = min(config.release, config.deadzone) * config.axis_max
+        self.digital = config.digital
+        self.interval = 1.0 / config.max_rate if config.max_rate else 0.0
+        self.callbacks = None if callbacks is None else (
+            (callbacks.on_left, callbacks.on_right),
+            (callbacks.on_up, callbacks.on_down),
+        )
+
+    def handler(self, axis: int) -> Callable[[int], None]:
+        return lambda value: self.update(axis, value)
+
+    def update(self, axis: int, value: int):
+        values, directions = self.values, self.directions
+        values[axis] = value
+        magnitude = math.hypot(values[0], values[1])
+        self.engaged = magnitude >= (self.release if self.engaged else self.press)
+        for i in (0, 1):
+            v, old = values[i], directions[i]
+            if not self.engaged:
+                new = 0
+            elif old and v * old >= self.release:
+                new = old
+            elif abs(v) >= self.press:
+                new = 1 if v > 0 else -1
+            else:
+                new = 0
+            if self.callbacks is None:
+                directions[i] = new
+                continue
+            negative, positive = self.callbacks[i]
+            if new != old:
+                directions[i] = new
+                if old:
+                    (positive if old > 0 else negative)(0)
+                if new:
+                    (positive if new > 0 else negative)(abs(v))
+                    self.sent[i] = time.monotonic() if self.interval else 0.0
+            elif new and i == axis and not self.digital:
+                if self.interval:
+                    now = time.monotonic()
+                    if now - self.sent[i] < self.interval:
+                        continue
+                    self.sent[i] = now
+                (positive if new > 0 else negative)(abs(v))
+
+
+class _Callbacks:
+    """Callback group that lets owning controllers rebuild their dispatch tables."""
+
+    def __setattr__(self, name: str, value):
+        object.__setattr__(self, name, value)
+        for owner in self.__dict__.get("_owners", ()):
+            owner._build_dispatch()
+
+
+class StickCallbacks(_Callbacks):
     def __init__(
         self,
         on_left: Optional[Callable[[int], None]] = None,
@@ -53,7 +220,7 @@ class StickCallbacks:
         self.on_down = on_down or _noop
 
 
-class ButtonCallbacks:
+class ButtonCallbacks(_Callbacks):
     def __init__(
         self,
         on_x: Optional[Callable[[int], None]] = None,
@@ -89,7 +256,7 @@ class ButtonCallbacks:
 
 class Controller:
     # Joystick API (/dev/input/js*) struct: timestamp(u32), value(s16), type(u8), number(u8)
-    _JS_FORMAT = "lhBB"
+    _JS_FORMAT = "=IhBB"
     _JS_SIZE = struct.calcsize(_JS_FORMAT)
 
     # Evdev API (/dev/input/event*) struct: tv_sec(long), tv_usec(long), type(u16), code(u16), value(s32)
@@ -97,9 +264,14 @@ class Controller:
     _EV_SIZE = struct.calcsize(_EV_FORMAT)
 
     # Evdev event types
+    _EV_SYN = 0x00
     _EV_KEY = 0x01
     _EV_ABS = 0x03
 
+    # EV_SYN codes
+    _SYN_REPORT = 0
+    _SYN_DROPPED = 3
+
     # Evdev button codes -> callback method name
     _EVDEV_BUTTON_MAP = {
         0x130: "on_a",       # BTN_SOUTH / BTN_A
@@ -155,6 +327,22 @@ class Controller:
         13: "on_capture",
     }
 
+    # Event code -> ControllerState button bit / axis index
+    _EVDEV_BUTTON_BITS = {
+        code: _BUTTON_BIT[name[3:]] for code, name in _EVDEV_BUTTON_MAP.items()
+    }
+    _EVDEV_AXIS_INDEX = {
+        code: AXIS_INDEX[f"{_AXIS_PREFIX[attr]}_{axis}"]
+        for code, (attr, axis) in _EVDEV_AXIS_MAP.items()
+    }
+    _JS_BUTTON_BITS = {
+        number: _BUTTON_BIT[name[3:]] for number, name in _JS_BUTTON_MAP.items()
+    }
+    _JS_AXIS_INDEX = {
+        number: AXIS_INDEX[f"{_AXIS_PREFIX[attr]}_{axis}"]
+        for (_, number), (attr, axis) in _JS_AXIS_MAP.items()
+    }
+
     def __init__(
         self,
         device: Optional[str] = None,
@@ -162,9 +350,33 @@ class Controller:
         left_stick_callbacks: Optional[StickCallbacks] = None,
         right_stick_callbacks: Optional[StickCallbacks] = None,
         button_callbacks: Optional[ButtonCallbacks] = None,
+        recorder=None,
+        stick_filter: Optional[StickFilter] = DEFAULT_STICK_FILTER,
     ):
         self.device = device
-        self._running = False
+        self.stick_filter = stick_filter  # None passes raw stick values through
+        self.recorder = recorder  # e.g. recording.EventRecorder
+        self._stop_requested = False  # set by stop(), cleared when a run ends
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._frame_axes: Dict[int, InputEvent] = {}
+        self._syn_dropped = False
+        self._state = EMPTY_STATE
+        self._buttons = 0
+        self._axes = [0] * len(AXIS_NAMES)
+        self._directions = [0] * len(AXIS_NAMES)
+        self._pressed_at = [0.0] * len(BUTTON_NAMES)
+        self._moved_at = [0.0] * len(AXIS_NAMES)
+        # Filters for the state snapshot's stick directions, kept apart from
+        # the dispatch gates because state is tracked before dispatch (and
+        # without it): axis index -> (gate, gate axis, indices of both axes)
+        self._state_gates: Dict[int, Tuple[_StickGate, int, Tuple[int, int]]] = {}
+        if stick_filter is not None:
+            for prefix in ("left", "right"):
+                gate = _StickGate(None, stick_filter)
+                pair = (AXIS_INDEX[prefix + "_x"], AXIS_INDEX[prefix + "_y"])
+                for local, index in enumerate(pair):
+                    self._state_gates[index] = (gate, local, pair)
         self.dpad_callbacks = dpad_callbacks or StickCallbacks()
         self.left_stick_callbacks = left_stick_callbacks or StickCallbacks()
         self.right_stick_callbacks = right_stick_callbacks or StickCallbacks()
@@ -173,44 +385,106 @@ class Controller:
     def _is_evdev(self) -> bool:
         return "event" in os.path.basename(self.device)
 
-    def _dispatch_stick(self, callbacks: StickCallbacks, axis: str, value: int):
+    @staticmethod
+    def _stick_handler(callbacks: StickCallbacks, axis: str) -> Callable[[int], None]:
         if axis == "x":
+            negative, positive = callbacks.on_left, callbacks.on_right
+        else:
+            negative, positive = callbacks.on_up, callbacks.on_down
+
+        def handle(value: int):
             if value > 0:
-                callbacks.on_right(value)
-            elif value < 0:
-                callbacks.on_left(abs(value))
-            else:
-                callbacks.on_left(0)
-                callbacks.on_right(0)
-        elif axis == "y":
-            if value > 0:
-                callbacks.on_down(value)
+                positive(value)
             elif value < 0:
-                callbacks.on_up(abs(value))
+                negative(-value)
             else:
-                callbacks.on_up(0)
-                callbacks.on_down(0)
+                negative(0)
+                positive(0)
+
+        return handle
+
+    def _build_dispatch(self):
+        """Flatten the maps into tables indexed by event type, then code."""
+        if not hasattr(self, "_button_callbacks"):
+            return  # still constructing
+        for callbacks in (
+            self._dpad_callbacks, self._left_stick_callbacks,
+            self._right_stick_callbacks, self._button_callbacks,
+        ):
+            owners = callbacks.__dict__.get("_owners")
+            if owners is None:
+                owners = weakref.WeakSet()
+                object.__setattr__(callbacks, "_owners", owners)
+            owners.add(self)
+
+        def table(mapping, handler):
+            entries: List[Optional[Callable[[int], None]]] = [None] * (max(mapping) + 1)
+            for code, target in mapping.items():
+                entries[code] = handler(target)
+            return entries
+
+        buttons = self._button_callbacks
+        gates: Dict[str, _StickGate] = {}
+
+        def button(name):
+            return getattr(buttons, name)
+
+        def stick(target):
+            attr, axis = target
+            if attr == "dpad_callbacks" or self.stick_filter is None:
+                return self._stick_handler(getattr(self, attr), axis)
+            if attr not in gates:
+                gates[attr] = _StickGate(getattr(self, attr), self.stick_filter)
+            return gates[attr].handler(0 if axis == "x" else 1)
+
+        evdev: List[list] = [[] for _ in range(self._EV_ABS + 1)]
+        evdev[self._EV_KEY] = table(self._EVDEV_BUTTON_MAP, button)
+        evdev[self._EV_ABS] = table(self._EVDEV_AXIS_MAP, stick)
+        js: List[list] = [[] for _ in range(3)]
+        js[1] = table(self._JS_BUTTON_MAP, button)
+        js[2] = table({n: t for (_, n), t in self._JS_AXIS_MAP.items()}, stick)
+        self._evdev_table = evdev
+        self._js_table = js
+
+    def _callbacks_property(name: str):
+        attr = "_" + name
+
+        def get(self):
+            return getattr(self, attr)
+
+        def set(self, callbacks):
+            setattr(self, attr, callbacks)
+            self._build_dispatch()
+
+        return property(get, set)
+
+    dpad_callbacks = _callbacks_property("dpad_callbacks")
+    left_stick_callbacks = _callbacks_property("left_stick_callbacks")
+    right_stick_callbacks = _callbacks_property("right_stick_callbacks")
+    button_callbacks = _callbacks_property("button_callbacks")
+    del _callbacks_property
 
     def _parse_js_event(self, ev_type: int, number: int, value: int):
-        if ev_type == 2:
-            key = (ev_type, number)
-            if key in self._JS_AXIS_MAP:
-                attr, axis = self._JS_AXIS_MAP[key]
-                self._dispatch_stick(getattr(self, attr), axis, value)
-        elif ev_type == 1:
-            if number in self._JS_BUTTON_MAP:
-                getattr(self.button_callbacks, self._JS_BUTTON_MAP[number])(value)
+        # Init events (type | 0x80) fall outside the table and are ignored
+        if ev_type < 3:
+            handlers = self._js_table[ev_type]
+            if number < len(handlers):
+                handler = handlers[number]
+                if handler is not None:
+                    handler(value)
 
     def _parse_evdev_event(self, ev_type: int, code: int, value: int):
-        if ev_type == self._EV_KEY:
-            if code in self._EVDEV_BUTTON_MAP:
-                getattr(self.button_callbacks, self._EVDEV_BUTTON_MAP[code])(value)
-        elif ev_type == self._EV_ABS:
-            if code in self._EVDEV_AXIS_MAP:
-                attr, axis = self._EVDEV_AXIS_MAP[code]
-                self._dispatch_stick(getattr(self, attr), axis, value)
+        if ev_type <= self._EV_ABS:
+            handlers = self._evdev_table[ev_type]
+            if code < len(handlers):
+                handler = handlers[code]
+                if handler is not None:
+                    handler(value)
 
-    def listen(self):
+    # Events decoded per read; a burst of stick motion fits in one syscall
+    _READ_EVENTS = 256
+
+    def _resolve_device(self) -> str:
         if self.device is None:
             self.device = find_controller_device()
         if self.device is None:
@@ -218,23 +492,209 @@ class Controller:
                 "No controller found. Make sure it's connected via Bluetooth "
                 "and a /dev/input/js* or /dev/input/event* device exists."
             )
+        return self.device
 
+    def _decode(self, data: bytes, evdev: bool) -> List[InputEvent]:
+        if evdev:
+            return [
+                InputEvent(sec + usec / 1e6, ev_type, code, value)
+                for sec, usec, ev_type, code, value in struct.iter_unpack(
+                    self._EV_FORMAT, data
+                )
+            ]
+        return [
+            InputEvent(ms / 1000.0, ev_type, number, value)
+            for ms, value, ev_type, number in struct.iter_unpack(
+                self._JS_FORMAT, data
+            )
+        ]
+
+    def _coalesce(self, events: List[InputEvent]) -> List[InputEvent]:
+        """Collapse evdev axis updates to their last value per SYN_REPORT frame.
+
+        Button events pass straight through; axis events are held until the
+        frame's SYN_REPORT and only the final value per axis is emitted,
+        followed by the SYN_REPORT itself. After a SYN_DROPPED everything up
+        to the next SYN_REPORT is discarded, as the evdev docs require.
+        """
+        out = []
+        axes = self._frame_axes
+        for event in events:
+            if event.type == self._EV_SYN:
+                if event.code == self._SYN_REPORT:
+                    if not self._syn_dropped:
+                        out.extend(axes.values())
+                        out.append(event)
+                    self._syn_dropped = False
+                    axes.clear()
+                elif event.code == self._SYN_DROPPED:
+                    self._syn_dropped = True
+                    axes.clear()
+            elif self._syn_dropped:
+                continue
+            elif event.type == self._EV_ABS:
+                axes[event.code] = event
+            else:
+                out.append(event)
+        return out
+
+    def _reset_stream(self):
+        self._frame_axes.clear()
+        self._syn_dropped = False
+
+    def _ingest(self, events: List[InputEvent], evdev: bool) -> List[InputEvent]:
+        """Coalesce decoded events and fold them into the published state."""
+        if evdev:
+            events = self._coalesce(events)
+        # Publish state first, so callbacks see a snapshot at least as new
+        # as the event they are handling
+        self._track(events, evdev)
+        return events
+
+    @property
+    def state(self) -> ControllerState:
+        """The latest snapshot; safe to poll from any thread without locking."""
+        return self._state
+
+    def _track(self, events: List[InputEvent], evdev: bool):
+        """Fold events into the working state and publish a snapshot per frame.
+
+        Evdev devices publish on SYN_REPORT; joystick devices have no frame
+        marker, so a snapshot is published per read. Joystick init events
+        (type | 0x80) report the initial state and are applied too.
+        """
+        if evdev:
+            key_type, abs_type = self._EV_KEY, self._EV_ABS
+            button_bits, axis_index = self._EVDEV_BUTTON_BITS, self._EVDEV_AXIS_INDEX
+        else:
+            key_type, abs_type = 1, 2
+            button_bits, axis_index = self._JS_BUTTON_BITS, self._JS_AXIS_INDEX
+        axes, directions, moved_at = self._axes, self._directions, self._moved_at
+        gates = self._state_gates
+        changed = False
+        for stamp, ev_type, code, value in events:
+            if not evdev:
+                ev_type &= 0x7F
+            if ev_type == key_type:
+                bit = button_bits.get(code)
+                if bit is not None:
+                    mask = 1 << bit
+                    if value and not self._buttons & mask:
+                        self._buttons |= mask
+                        self._pressed_at[bit] = stamp
+                    elif not value:
+                        self._buttons &= ~mask
+                    changed = True
+            elif ev_type == abs_type:
+                index = axis_index.get(code)
+                if index is not None:
+                    axes[index] = value
+                    gate = gates.get(index)
+                    if gate is None:
+                        direction = (value > 0) - (value < 0)
+                        if direction != directions[index]:
+                            directions[index] = direction
+                            moved_at[index] = stamp
+                    else:
+                        gate, local, pair = gate
+                        gate.update(local, value)
+                        # Engaging or releasing the stick can flip both axes
+                        for direction, i in zip(gate.directions, pair):
+                            if direction != directions[i]:
+                                directions[i] = direction
+                                moved_at[i] = stamp
+                    changed = True
+            elif evdev and ev_type == self._EV_SYN and code == self._SYN_REPORT:
+                self._publish(stamp)
+                changed = False
+        if changed and not evdev:
+            self._publish(events[-1].time)
+
+    def _publish(self, stamp: float):
+        self._state = ControllerState(
+            self._state.frame + 1, stamp, time.monotonic(), self._buttons,
+            tuple(self._axes), tuple(self._directions), tuple(self._pressed_at),
+            tuple(self._moved_at),
+        )
+
+    async def events(self, dispatch: bool = True) -> AsyncIterator[InputEvent]:
+        """Yield device events from the running asyncio loop.
+
+        The device is opened non-blocking and watched with loop.add_reader,
+        so the game loop and other inputs can share the same event loop.
+        Callbacks are fired for each event too, unless ``dispatch`` is False.
+        Evdev axis motion is coalesced per SYN_REPORT frame, so a noisy
+        stick yields one event per axis per frame rather than every sample.
+        Iteration ends when the device goes away or stop() is called.
+        """
+        device = self._resolve_device()
         evdev = self._is_evdev()
-        fmt = self._EV_FORMAT if evdev else self._JS_FORMAT
         size = self._EV_SIZE if evdev else self._JS_SIZE
-
-        self._running = True
-        with open(self.device, "rb") as device:
-            while self._running:
-                data = device.read(size)
+        loop = asyncio.get_running_loop()
+        fd = os.open(device, os.O_RDONLY | os.O_NONBLOCK)
+        pending = b""
+        self._reset_stream()
+        if self.recorder is not None:
+            self.recorder.start(evdev, self._EV_FORMAT if evdev else self._JS_FORMAT)
+        parse = self._parse_evdev_event if evdev else self._parse_js_event
+        self._loop = loop
+        try:
+            while not self._stop_requested:
+                try:
+                    data = os.read(fd, size * self._READ_EVENTS)
+                except BlockingIOError:
+                    await self._wait_readable(loop, fd)
+                    continue
+                except OSError:
+                    break  # device removed
                 if not data:
                     break
-                if evdev:
-                    _, _, ev_type, code, value = struct.unpack(fmt, data)
-                    self._parse_evdev_event(ev_type, code, value)
-                else:
-                    _, value, ev_type, number = struct.unpack(fmt, data)
-                    self._parse_js_event(ev_type, number, value)
+                data = pending + data
+                usable = len(data) - len(data) % size
+                pending = data[usable:]
+                if self.recorder is not None:
+                    self.recorder.write(data[:usable])
+                events = self._decode(memoryview(data)[:usable], evdev)
+                for event in self._ingest(events, evdev):
+                    if dispatch:
+                        parse(event.type, event.code, event.value)
+                    yield event
+        finally:
+            self._stop_requested = False
+            self._loop = None
+            os.close(fd)
+            if self.recorder is not None:
+                self.recorder.close()
+
+    async def _wait_readable(self, loop: asyncio.AbstractEventLoop, fd: int):
+        self._waiter = loop.create_future()
+        if self._stop_requested:  # stop() ran before there was a waiter to wake
+            _wake(self._waiter)
+        loop.add_reader(fd, _wake, self._waiter)
+        try:
+            await self._waiter
+        finally:
+            loop.remove_reader(fd)
+            self._waiter = None
+
+    async def _listen_async(self):
+        async for _ in self.events():
+            pass
+
+    def listen(self):
+        """Read events and fire callbacks until stop() or the device goes away.
+
+        Blocks the calling thread; stop() can be called from any thread and
+        takes effect immediately, even if it lands before the loop starts.
+        """
+        self._resolve_device()
+        asyncio.run(self._listen_async())
 
     def stop(self):
-        self._running = False
+        self._stop_requested = True
+        loop, waiter = self._loop, self._waiter
+        if loop is not None and waiter is not None:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # loop already closed
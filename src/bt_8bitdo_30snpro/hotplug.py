@@ -0,0 +1,261 @@
+"""Hotplug-aware discovery for one or more controllers.
+
+DeviceManager watches the input directory (inotify where available, a
+directory poll otherwise), binds a Controller to every controller device
+that appears and drops it again when the device goes away, so a Bluetooth
+reconnect doesn't need a restart. Each physical pad gets one slot, even
+though the kernel exposes it as both a js* and an event* node.
+
+Usage:
+    manager = DeviceManager(lambda path, slot: Controller(path, ...))
+    threading.Thread(target=manager.run, daemon=True).start()
+    ...
+    manager.stop()
+"""
+
+import asyncio
+import os
+import struct
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from bt_8bitdo_30snpro.controller import Controller, _wake, is_controller_name
+
+try:
+    import ctypes
+    import ctypes.util
+
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _libc.inotify_init1.argtypes = [ctypes.c_int]
+    _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+except (ImportError, OSError, AttributeError):
+    _libc = None
+
+# inotify constants from <sys/inotify.h>
+_IN_ATTRIB = 0x004
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+_IN_MASK = _IN_ATTRIB | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_IN_EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+# factory(path, slot) -> Controller, or None to leave the device unbound
+ControllerFactory = Callable[[str, int], Optional[Controller]]
+
+
+def _inotify_watch(path: str) -> Optional[int]:
+    """An inotify fd watching ``path``, or None if inotify is unavailable."""
+    if _libc is None:
+        return None
+    fd = _libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    if fd < 0:
+        return None
+    if _libc.inotify_add_watch(fd, os.fsencode(path), _IN_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _changed_names(data: bytes) -> List[str]:
+    names = []
+    offset = 0
+    while offset + _IN_EVENT.size <= len(data):
+        _, _, _, length = _IN_EVENT.unpack_from(data, offset)
+        offset += _IN_EVENT.size
+        names.append(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+        offset += length
+    return names
+
+
+class DeviceManager:
+    """Keeps a Controller bound to every connected controller device.
+
+    ``factory`` builds the Controller for a device path and a slot number
+    (the lowest free one, so player 1 keeps slot 0 across reconnects).
+    ``on_connect``/``on_disconnect`` are called with (slot, controller)
+    when a device is bound and when its controller stops reading.
+    ``input_dir`` and ``sysfs_dir`` can point at a temp directory of fake
+    nodes for testing.
+    """
+
+    def __init__(
+        self,
+        factory: ControllerFactory,
+        input_dir: str = "/dev/input",
+        sysfs_dir: str = "/sys/class/input",
+        poll_interval: float = 1.0,
+        use_inotify: bool = True,
+        on_connect: Optional[Callable[[int, Controller], None]] = None,
+        on_disconnect: Optional[Callable[[int, Controller], None]] = None,
+    ):
+        self.factory = factory
+        self.input_dir = input_dir
+        self.sysfs_dir = sysfs_dir
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self._info: Dict[str, Tuple[Optional[str], str]] = {}  # node -> (name, parent)
+        self._bound: Dict[str, Tuple[int, Controller]] = {}  # path -> (slot, controller)
+        # slot -> controller, replaced whole (never mutated) so other threads
+        # can iterate it while the manager binds and drops devices
+        self._controllers: Dict[int, Controller] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._declined: Set[str] = set()
+        self._stop_requested = False  # set by stop(), cleared when a run ends
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Future] = None
+
+    @property
+    def controllers(self) -> Dict[int, Controller]:
+        """Bound controllers by slot; safe to read from any thread. Treat it
+        as read-only: it is a snapshot that the manager replaces."""
+        return self._controllers
+
+    def controller(self, slot: int = 0) -> Optional[Controller]:
+        return self._controllers.get(slot)
+
+    # --- Discovery ---
+
+    def _node_info(self, node: str) -> Tuple[Optional[str], str]:
+        """(sysfs device name or None, physical device id), cached per node."""
+        info = self._info.get(node)
+        if info is None:
+            device = os.path.join(self.sysfs_dir, node, "device")
+            try:
+                with open(os.path.join(device, "name")) as f:
+                    name: Optional[str] = f.read()
+            except OSError:
+                name = None
+            parent = os.path.realpath(device) if os.path.isdir(device) else node
+            info = self._info[node] = (name, parent)
+        return info
+
+    def scan(self) -> List[str]:
+        """Controller device paths present now, one per physical device.
+
+        A js* node is preferred over the event* node of the same device, as
+        in find_controller_device(). Nodes with no readable sysfs name are
+        kept for js* and skipped for event*.
+        """
+        try:
+            nodes = sorted(os.listdir(self.input_dir))
+        except OSError:
+            return []
+        for node in set(self._info) - set(nodes):
+            del self._info[node]
+        chosen: Dict[str, str] = {}
+        for node in nodes:
+            js = node.startswith("js")
+            if not js and not node.startswith("event"):
+                continue
+            name, parent = self._node_info(node)
+            if name is None and not js or name is not None and not is_controller_name(name):
+                continue
+            if parent not in chosen or js and not chosen[parent].startswith("js"):
+                chosen[parent] = node
+        return sorted(os.path.join(self.input_dir, node) for node in chosen.values())
+
+    # --- Binding ---
+
+    def _sync(self):
+        present = self.scan()
+        self._declined &= set(present)
+        used = {slot for slot, _ in self._bound.values()}
+        for path in present:
+            if path in self._bound or path in self._declined:
+                continue
+            slot = next(i for i in range(len(used) + 1) if i not in used)
+            controller = self.factory(path, slot)
+            if controller is None:
+                self._declined.add(path)
+                continue
+            used.add(slot)
+            self._bound[path] = (slot, controller)
+            self._controllers = {**self._controllers, slot: controller}
+            self._tasks[path] = self._loop.create_task(self._drive(path, slot, controller))
+
+    async def _drive(self, path: str, slot: int, controller: Controller):
+        if self.on_connect is not None:
+            self.on_connect(slot, controller)
+        failed = False
+        try:
+            async for _ in controller.events():
+                pass
+        except OSError:
+            # Not openable yet (e.g. udev still setting permissions); back
+            # off before the manager tries again
+            failed = True
+            await asyncio.sleep(self.poll_interval)
+        finally:
+            del self._bound[path]
+            del self._tasks[path]
+            self._controllers = {
+                s: c for s, c in self._controllers.items() if s != slot
+            }
+            if self.on_disconnect is not None:
+                self.on_disconnect(slot, controller)
+        if failed and self._waiter is not None:
+            _wake(self._waiter)
+
+    # --- Main loop ---
+
+    async def _wait(self, fd: Optional[int], timeout: Optional[float]):
+        loop = self._loop
+        self._waiter = loop.create_future()
+        if self._stop_requested:  # stop() ran before there was a waiter to wake
+            _wake(self._waiter)
+        if fd is not None:
+            loop.add_reader(fd, _wake, self._waiter)
+        handle = loop.call_later(timeout, _wake, self._waiter) if timeout else None
+        try:
+            await self._waiter
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+            if handle is not None:
+                handle.cancel()
+            self._waiter = None
+
+    async def serve(self):
+        """Watch for devices and drive their controllers until stop()."""
+        self._loop = asyncio.get_running_loop()
+        fd = _inotify_watch(self.input_dir) if self.use_inotify else None
+        try:
+            while not self._stop_requested:
+                self._sync()
+                if fd is None:
+                    await self._wait(None, self.poll_interval)
+                    continue
+                await self._wait(fd, None)
+                try:
+                    data = os.read(fd, 4096)
+                except BlockingIOError:
+                    continue
+                for node in _changed_names(data):
+                    self._info.pop(node, None)  # node reused by another device
+        finally:
+            self._stop_requested = False
+            if fd is not None:
+                os.close(fd)
+            tasks = list(self._tasks.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._loop = None
+
+    def run(self):
+        """Blocking version of serve() for a background thread."""
+        asyncio.run(self.serve())
+
+    def stop(self):
+        """Stop watching and disconnect all controllers; safe from any thread."""
+        self._stop_requested = True
+        loop, waiter = self._loop, self._waiter
+        if loop is not None and waiter is not None:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # loop already closed
@@ -0,0 +1,190 @@
+"""Record raw controller events to a file and replay them later.
+
+A recording is a small header followed by the device's event structs
+exactly as they were read:
+
+    magic (8 bytes) | version (u16) | metadata length (u32) | metadata JSON | events
+
+The metadata says whether the events are evdev or joystick structs and
+which struct format they use, plus anything the caller adds (e.g. the game
+seed), so a session can be fed back through the same parsing paths. The
+format is stored with explicit sizes and byte order (evdev's native longs
+become "q" or "i"), so a recording made on a 64-bit machine replays
+correctly on a 32-bit Pi and vice versa.
+"""
+
+import asyncio
+import json
+import struct
+import sys
+from typing import AsyncIterator, List, Optional, Tuple
+
+from bt_8bitdo_30snpro.controller import Controller, InputEvent, _wake
+
+MAGIC = b"SN30REC\x00"
+VERSION = 1
+_HEADER = struct.Struct("<8sHI")
+
+
+# Standard-size code for a native long on this machine
+_NATIVE_LONG = "q" if struct.calcsize("l") == 8 else "i"
+
+
+def _portable_format(fmt: str) -> str:
+    """``fmt`` with explicit byte order and sizes, decoding the same bytes here."""
+    if fmt[:1] in "<>!":
+        return fmt
+    body = fmt[1:] if fmt[:1] in "@=" else fmt
+    order = "<" if sys.byteorder == "little" else ">"
+    portable = order + body.replace("l", _NATIVE_LONG).replace("L", _NATIVE_LONG.upper())
+    if struct.calcsize(portable) != struct.calcsize(fmt):
+        raise ValueError(f"Cannot record struct format {fmt!r} portably")
+    return portable
+
+
+class EventRecorder:
+    """Writes the raw event stream of a Controller to ``path``."""
+
+    def __init__(self, path: str, metadata: Optional[dict] = None):
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self._file = None
+        self._started = False
+
+    def start(self, evdev: bool, fmt: str):
+        """Open the file when reading starts; a reconnect appends to it."""
+        if self._file is not None:
+            return
+        if self._started:
+            self._file = open(self.path, "ab")
+            return
+        fmt = _portable_format(fmt)
+        meta = dict(self.metadata, evdev=evdev, format=fmt, size=struct.calcsize(fmt))
+        blob = json.dumps(meta, sort_keys=True).encode()
+        self._file = open(self.path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, len(blob)) + blob)
+        self._started = True
+
+    def write(self, data: bytes):
+        if self._file is not None:
+            self._file.write(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_recording(path: str) -> Tuple[dict, bytes]:
+    """Return (metadata, raw event bytes) from a recording file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path}: not an event recording")
+    magic, version, length = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not an event recording")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported recording version {version}")
+    start = _HEADER.size + length
+    return json.loads(data[_HEADER.size:start]), data[start:]
+
+
+class ReplayController(Controller):
+    """A Controller that reads a recording instead of a device.
+
+    Events go through the same decode, coalescing, state and ``_parse_*``
+    paths as live input. ``speed`` scales the recorded timing (1.0 is real
+    time); None replays as fast as possible.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0, **callbacks):
+        super().__init__(device=path, **callbacks)
+        self.metadata, self._data = read_recording(path)
+        self.speed = speed
+        fmt = self.metadata["format"]
+        size = struct.calcsize(fmt)
+        # Older recordings have a native format and no size to check against
+        if self.metadata.get("size", size) != size:
+            raise ValueError(
+                f"{path}: struct format {fmt!r} is {size} bytes here, "
+                f"recorded as {self.metadata['size']}"
+            )
+        if self.metadata["evdev"]:
+            self._EV_FORMAT, self._EV_SIZE = fmt, size
+        else:
+            self._JS_FORMAT, self._JS_SIZE = fmt, size
+
+    def _is_evdev(self) -> bool:
+        return bool(self.metadata["evdev"])
+
+    def _frames(self, evdev: bool) -> List[List[InputEvent]]:
+        """Split the recording into the groups a device read would deliver."""
+        size = self._EV_SIZE if evdev else self._JS_SIZE
+        usable = len(self._data) - len(self._data) % size  # drop a torn tail
+        events = self._decode(memoryview(self._data)[:usable], evdev)
+        if not evdev:
+            return [[event] for event in events]
+        frames, frame = [], []
+        for event in events:
+            frame.append(event)
+            if event.type == self._EV_SYN and event.code == self._SYN_REPORT:
+                frames.append(frame)
+                frame = []
+        if frame:
+            frames.append(frame)
+        return frames
+
+    def frames(self) -> List[List[InputEvent]]:
+        """The recording's input frames, oldest first, ready to be fed.
+
+        A frame's last event carries its time. Use this with feed() to step
+        through a recording synchronously, e.g. on a simulated clock.
+        """
+        self._reset_stream()
+        return self._frames(self._is_evdev())
+
+    def feed(self, frame: List[InputEvent], dispatch: bool = True) -> List[InputEvent]:
+        """Fold one frame into the state and fire its callbacks, as a read would."""
+        evdev = self._is_evdev()
+        events = self._ingest(frame, evdev)
+        if dispatch:
+            parse = self._parse_evdev_event if evdev else self._parse_js_event
+            for event in events:
+                parse(event.type, event.code, event.value)
+        return events
+
+    async def events(self, dispatch: bool = True) -> AsyncIterator[InputEvent]:
+        frames = self.frames()
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        try:
+            start = loop.time()
+            first = frames[0][-1].time if frames else 0.0
+            for frame in frames:
+                if self.speed:
+                    delay = start + (frame[-1].time - first) / self.speed - loop.time()
+                    if delay > 0:
+                        await self._sleep(loop, delay)
+                else:
+                    await asyncio.sleep(0)  # let other tasks run
+                if self._stop_requested:
+                    break
+                for event in self.feed(frame, dispatch):
+                    yield event
+        finally:
+            self._stop_requested = False
+            self._loop = None
+
+    async def _sleep(self, loop: asyncio.AbstractEventLoop, delay: float):
+        """Sleep that stop() can cut short."""
+        self._waiter = loop.create_future()
+        if self._stop_requested:  # stop() ran before there was a waiter to wake
+            _wake(self._waiter)
+        handle = loop.call_later(delay, _wake, self._waiter)
+        try:
+            await self._waiter
+        finally:
+            handle.cancel()
+            self._waiter = None
+
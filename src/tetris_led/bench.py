@@ -0,0 +1,358 @@
+"""Headless simulation and benchmarks for the game core and demo AI.
+
+Plays seeded games with no renderer and no sleeping, and reports throughput,
+AI decision latency, allocation figures, rotation and move generation cost,
+controller event throughput and terminal renderer cost as JSON so results
+can be compared across versions.
+
+Usage:
+    tetris-led bench [--games 10] [--seed 0] [--max-pieces 500] [--backend numpy]
+                     [--output FILE]
+    python -m tetris_led.bench
+"""
+
+import io
+import json
+import random
+import struct
+import sys
+import time
+import tracemalloc
+from typing import List, Optional, Sequence, Tuple
+
+from bt_8bitdo_30snpro.controller import Controller
+from tetris_led.demo_ai import (
+    DEFAULT_BACKEND,
+    DEFAULT_BEAM_WIDTH,
+    DEFAULT_DEPTH,
+    DEFAULT_WEIGHTS,
+    Weights,
+    compute_best_actions,
+    load_weights,
+)
+from tetris_led.game import (
+    PIECE_NAMES,
+    Action,
+    Piece,
+    TetrisGame,
+    _rotate_rows,
+)
+from tetris_led.metrics import percentiles
+from tetris_led.movegen import reachable_placements
+from tetris_led.renderer import TerminalRenderer
+
+# Action cycle that keeps the piece wandering around the upper board
+_MOVE_CYCLE = [
+    Action.LEFT, Action.LEFT, Action.ROTATE_CW, Action.RIGHT,
+    Action.RIGHT, Action.ROTATE_CCW, Action.RIGHT, Action.LEFT,
+]
+
+
+def _version() -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:
+        return "unknown"
+    try:
+        return version("rpi-8bitdo-sn30pro")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _filled_game(seed: int = 0, width: int = 10, height: int = 20) -> TetrisGame:
+    """A game with a few rows of garbage so collision checks have work to do."""
+    game = TetrisGame(width=width, height=height, seed=seed)
+    rng = random.Random(seed)
+    grid = [row[:] for row in game.board]
+    for r in range(game.height - 6, game.height):
+        gap = rng.randrange(game.width)
+        grid[r] = [None if c == gap else (128, 128, 128) for c in range(game.width)]
+    game.board = grid
+    return game
+
+
+def bench_piece_moves(seconds: float = 1.0) -> float:
+    """Moves per second: one action plus one ghost lookup, as in play mode."""
+    game = _filled_game()
+    moves = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for act in _MOVE_CYCLE:
+            game.action(act)
+            game.get_drop_ghost()
+        moves += len(_MOVE_CYCLE)
+    return moves / (time.perf_counter() - start)
+
+
+def bench_rotations(seconds: float = 1.0) -> float:
+    """Rotations per second through the SRS kick tables, next to garbage rows."""
+    game = _filled_game()
+    rows, width, height = game.row_masks, game.width, game.height
+    pieces = [Piece(name, height - 9, width // 2 - 1) for name in PIECE_NAMES]
+    rotations = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for piece in pieces:
+            for direction in (1, 1, -1, 1, 1, -1, -1, -1):
+                piece = _rotate_rows(rows, width, height, piece, direction) or piece
+        rotations += 8 * len(pieces)
+    return rotations / (time.perf_counter() - start)
+
+
+def bench_move_generation(
+    sizes: Sequence[Tuple[int, int]] = ((10, 20), (20, 40), (32, 64)), calls: int = 50
+) -> dict:
+    """Milliseconds per reachable-placement search, per board size."""
+    report = {}
+    for width, height in sizes:
+        game = _filled_game(width=width, height=height)
+        timings = []
+        placements = 0
+        for _ in range(calls):
+            start = time.perf_counter()
+            moves = reachable_placements(game.row_masks, width, height, game.current_piece)
+            timings.append(time.perf_counter() - start)
+            placements += len(moves)
+        report[f"{width}x{height}"] = {
+            "placements": placements / calls,
+            "ms": {key: value * 1000.0 for key, value in percentiles(timings).items()},
+        }
+    return report
+
+
+def bench_terminal_renderer(frames: int = 2000) -> dict:
+    """Bytes per frame and draws per second of the terminal renderer."""
+    out = io.StringIO()
+    renderer = TerminalRenderer(out=out)
+    game = _filled_game()
+    written = 0
+    start = time.perf_counter()
+    for i in range(frames):
+        if game.game_over:
+            game = _filled_game(i)
+        game.action(Action.DROP if i % 16 == 15 else _MOVE_CYCLE[i % len(_MOVE_CYCLE)])
+        renderer.draw(game)
+        written += out.tell()
+        out.seek(0)
+        out.truncate()
+    elapsed = time.perf_counter() - start
+    return {"bytes_per_frame": written / frames, "draws_per_sec": frames / elapsed}
+
+
+def _synthetic_events(count: int, seed: int = 0) -> bytes:
+    """An evdev byte stream dominated by stick noise, as a Pi sees it."""
+    rng = random.Random(seed)
+    axes = list(Controller._EVDEV_AXIS_MAP)
+    buttons = list(Controller._EVDEV_BUTTON_MAP)
+    pack = Controller._EV_FORMAT
+    chunks = []
+    for i in range(count):
+        if i % 8 == 7:
+            chunks.append(struct.pack(pack, 0, 0, Controller._EV_SYN, 0, 0))
+        elif rng.random() < 0.1:
+            chunks.append(struct.pack(
+                pack, 0, 0, Controller._EV_KEY, rng.choice(buttons), rng.randint(0, 1)
+            ))
+        else:
+            chunks.append(struct.pack(
+                pack, 0, 0, Controller._EV_ABS, rng.choice(axes),
+                rng.randint(-32768, 32767),
+            ))
+    return b"".join(chunks)
+
+
+def bench_event_parsing(seconds: float = 1.0) -> dict:
+    """Events per second through the controller's decode and dispatch path.
+
+    ``parsed`` feeds every event to the parser; ``streamed`` goes through the
+    same decode, SYN_REPORT coalescing and dispatch steps as Controller.events().
+    """
+    controller = Controller("/dev/input/event0")
+    data = _synthetic_events(4096)
+    events = controller._decode(data, True)
+    triples = [event[1:] for event in events]
+    parse = controller._parse_evdev_event
+    result = {}
+
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds / 2
+    while time.perf_counter() < deadline:
+        for ev_type, code, value in triples:
+            parse(ev_type, code, value)
+        count += len(events)
+    result["parsed"] = count / (time.perf_counter() - start)
+
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds / 2
+    while time.perf_counter() < deadline:
+        for event in controller._coalesce(controller._decode(data, True)):
+            parse(event.type, event.code, event.value)
+        count += len(events)
+    result["streamed"] = count / (time.perf_counter() - start)
+    return result
+
+
+def play_game(
+    seed: int,
+    width: int = 10,
+    height: int = 20,
+    max_pieces: int = 500,
+    depth: int = DEFAULT_DEPTH,
+    beam_width: Optional[int] = DEFAULT_BEAM_WIDTH,
+    latencies: Optional[List[float]] = None,
+    weights: Optional[Weights] = None,
+    backend: Optional[str] = None,
+) -> Tuple[TetrisGame, int]:
+    """Play one seeded demo-AI game as fast as possible.
+
+    Returns the finished game and the number of pieces placed. The search
+    runs without a time budget so results only depend on the seed. Decision
+    times are appended to ``latencies`` when given.
+    """
+    game = TetrisGame(width=width, height=height, seed=seed)
+    pieces = 0
+    while not game.game_over and pieces < max_pieces:
+        start = time.perf_counter()
+        actions = compute_best_actions(
+            game, backend=backend, depth=depth, beam_width=beam_width,
+            time_budget=None, weights=weights,
+        )
+        if latencies is not None:
+            latencies.append(time.perf_counter() - start)
+        for act in actions:
+            game.action(act)
+        if actions and actions[-1] != Action.DROP:
+            game.tick()
+        pieces += 1
+    return game, pieces
+
+
+def _allocations(
+    seed: int,
+    width: int,
+    height: int,
+    depth: int,
+    beam_width: Optional[int],
+    weights: Optional[Weights],
+    pieces: int,
+    backend: Optional[str] = None,
+) -> dict:
+    """Traced allocation figures for one short game (run separately from timing)."""
+    tracemalloc.start()
+    try:
+        game = TetrisGame(width=width, height=height, seed=seed)
+        peaks = []
+        start_blocks = sys.getallocatedblocks()
+        placed = 0
+        while not game.game_over and placed < pieces:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            actions = compute_best_actions(
+                game, backend=backend, depth=depth, beam_width=beam_width,
+                time_budget=None, weights=weights,
+            )
+            for act in actions:
+                game.action(act)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+            placed += 1
+        retained = sys.getallocatedblocks() - start_blocks
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_bytes_per_piece": sum(peaks) / len(peaks) if peaks else 0.0,
+        "retained_blocks_per_piece": retained / placed if placed else 0.0,
+    }
+
+
+def simulate(
+    games: int = 10,
+    seed: int = 0,
+    width: int = 10,
+    height: int = 20,
+    max_pieces: int = 500,
+    depth: int = DEFAULT_DEPTH,
+    beam_width: Optional[int] = DEFAULT_BEAM_WIDTH,
+    weights: Optional[Weights] = None,
+    backend: Optional[str] = None,
+) -> dict:
+    """Play ``games`` seeded games headless and summarize them."""
+    latencies: List[float] = []
+    pieces = lines = score = 0
+    start = time.perf_counter()
+    for i in range(games):
+        game, placed = play_game(
+            seed + i, width, height, max_pieces, depth, beam_width, latencies,
+            weights, backend,
+        )
+        pieces += placed
+        lines += game.lines_cleared
+        score += game.score
+    elapsed = time.perf_counter() - start
+
+    return {
+        "version": _version(),
+        "python": sys.version.split()[0],
+        "config": {
+            "games": games,
+            "seed": seed,
+            "width": width,
+            "height": height,
+            "max_pieces": max_pieces,
+            "depth": depth,
+            "beam_width": beam_width,
+            "backend": backend or DEFAULT_BACKEND,
+            "weights": (weights or DEFAULT_WEIGHTS)._asdict(),
+        },
+        "pieces": pieces,
+        "pieces_per_sec": pieces / elapsed if elapsed else 0.0,
+        "pieces_per_game": pieces / games if games else 0.0,
+        "lines_per_game": lines / games if games else 0.0,
+        "score_per_game": score / games if games else 0.0,
+        "decision_ms": {
+            key: value * 1000.0 for key, value in percentiles(latencies).items()
+        },
+        "allocations": _allocations(
+            seed, width, height, depth, beam_width, weights, min(max_pieces, 100),
+            backend,
+        ),
+        "piece_moves_per_sec": bench_piece_moves(),
+        "rotations_per_sec": bench_rotations(),
+        "move_generation": bench_move_generation(),
+        "controller_events_per_sec": bench_event_parsing(),
+        "terminal_renderer": bench_terminal_renderer(),
+    }
+
+
+def run(args) -> dict:
+    """Entry point for the ``bench`` CLI sub-command."""
+    report = simulate(
+        games=args.games,
+        seed=args.seed,
+        width=args.width,
+        height=args.height,
+        max_pieces=args.max_pieces,
+        depth=args.depth,
+        beam_width=args.beam_width,
+        weights=load_weights(args.weights) if args.weights else None,
+        backend=args.backend,
+    )
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+def main():
+    print(json.dumps(simulate(games=3, max_pieces=200), indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
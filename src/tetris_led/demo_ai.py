@@ -1,149 +1,461 @@
 """Simple AI that plays Tetris automatically for demo/screensaver mode.
 
-Uses a basic heuristic: for each possible placement, score by:
+Searches placements of the current piece (every lock position the move
+generator can reach, tucks and spins included) and the previewed next piece
+(optionally further, as a beam search over the pieces left in the bag) and
+scores the resulting boards with a basic heuristic:
   - Minimizing aggregate height
   - Maximizing completed lines
   - Minimizing holes
   - Minimizing bumpiness (height differences between adjacent columns)
+
+Placements that land on identical cells (e.g. the rotations of O, S, Z and
+I that share a footprint) are only simulated once, positions already
+searched are looked up in a transposition table keyed by the board rows, and
+the search deepens iteratively so it can stop at a per-move time budget.
+
+By default each placement is scored as a delta from the surface features
+TetrisGame tracks (column heights, row fill counts, holes). With NumPy
+installed, the "numpy" backend scores all candidate placements of a piece in
+one batched pass over a stack of boolean boards. Both produce identical scores.
 """
 
-from tetris_led.game import Action, Piece, TetrisGame
+import json
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 
-# Weights tuned for a "pleasant to watch" demo (not hyper-optimized)
-_W_HEIGHT = -0.51
-_W_LINES = 0.76
-_W_HOLES = -0.36
-_W_BUMPINESS = -0.18
+from tetris_led.game import (
+    PIECE_NAMES,
+    Action,
+    Piece,
+    TetrisGame,
+    _fits_rows,
+    _heights_and_holes,
+    _land_rows,
+    _lock_rows,
+)
+from tetris_led.movegen import reachable_placements
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-def _column_heights(board, width, height):
-    heights = [0] * width
-    for c in range(width):
-        for r in range(height):
-            if board[r][c] is not None:
-                heights[c] = height - r
-                break
-    return heights
+BACKENDS = ("python", "numpy")
+DEFAULT_BACKEND = "python"
 
+DEFAULT_DEPTH = 2            # current piece + next-piece preview
+DEFAULT_BEAM_WIDTH = 8       # placements expanded per node below the leaves
+DEFAULT_TIME_BUDGET = 0.1    # seconds per move before settling for a shallower result
 
-def _count_holes(board, width, height):
-    holes = 0
-    for c in range(width):
-        found_block = False
-        for r in range(height):
-            if board[r][c] is not None:
-                found_block = True
-            elif found_block:
-                holes += 1
-    return holes
+# Positions already searched: (rows, width, pieces, unknown, beam width, weights) -> value
+# (None in pieces marks a piece not previewed yet; see plan_placement)
+_TRANSPOSITIONS: Dict[tuple, float] = {}
+_TRANSPOSITION_LIMIT = 1 << 15
 
 
-def _completed_lines(board, width, height):
-    return sum(
-        1 for r in range(height) if all(board[r][c] is not None for c in range(width))
-    )
+class Weights(NamedTuple):
+    """Heuristic weights for the board features."""
+
+    height: float
+    lines: float
+    holes: float
+    bumpiness: float
+
 
+# Weights tuned for a "pleasant to watch" demo (not hyper-optimized);
+# `tetris-led tune` searches for better ones
+DEFAULT_WEIGHTS = Weights(height=-0.51, lines=0.76, holes=-0.36, bumpiness=-0.18)
 
-def _evaluate(board, width, height):
-    col_heights = _column_heights(board, width, height)
-    agg_height = sum(col_heights)
-    lines = _completed_lines(board, width, height)
-    holes = _count_holes(board, width, height)
-    bumpiness = sum(abs(col_heights[i] - col_heights[i + 1]) for i in range(width - 1))
 
+def load_weights(path: str) -> Weights:
+    """Read weights from a JSON file written by `tetris-led tune`.
+
+    Accepts either the tuner's report (weights under a "weights" key) or a
+    bare {"height": ..., "lines": ..., "holes": ..., "bumpiness": ...} object.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    data = data.get("weights", data)
+    try:
+        return Weights(*(float(data[field]) for field in Weights._fields))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid weights file {path!r}: {e}") from e
+
+
+def _evaluate(agg_height, lines, holes, bumpiness, weights: Weights = DEFAULT_WEIGHTS):
     return (
-        _W_HEIGHT * agg_height
-        + _W_LINES * lines
-        + _W_HOLES * holes
-        + _W_BUMPINESS * bumpiness
+        weights.height * agg_height
+        + weights.lines * lines
+        + weights.holes * holes
+        + weights.bumpiness * bumpiness
     )
 
 
-def _simulate_placement(game: TetrisGame, piece: Piece):
-    """Simulate dropping a piece and return the resulting board score."""
-    import copy
-
-    board = [row[:] for row in game.board]
-
-    # Drop piece to bottom
-    test = piece
-    while True:
-        moved = test.moved(1, 0)
-        fits = True
-        for r, c in moved.cells:
-            if c < 0 or c >= game.width or r >= game.height:
-                fits = False
-                break
-            if r >= 0 and board[r][c] is not None:
-                fits = False
-                break
-        if not fits:
-            break
-        test = moved
+class _Surface(NamedTuple):
+    """Surface features of the board that candidates are dropped onto."""
 
-    # Lock onto board
-    for r, c in test.cells:
-        if 0 <= r < game.height and 0 <= c < game.width:
-            board[r][c] = test.color
+    heights: Tuple[int, ...]
+    row_fill: Tuple[int, ...]
+    agg_height: int
+    holes: int
+    bumpiness: int
+    lines: int
 
-    return _evaluate(board, game.width, game.height)
 
+def _make_surface(heights, row_fill, holes, width) -> _Surface:
+    return _Surface(
+        heights=heights,
+        row_fill=row_fill,
+        agg_height=sum(heights),
+        holes=holes,
+        bumpiness=sum(abs(heights[i] - heights[i + 1]) for i in range(width - 1)),
+        lines=sum(1 for n in row_fill if n == width),
+    )
 
-def compute_best_actions(game: TetrisGame) -> list[Action]:
-    """Compute the sequence of actions to reach the best placement."""
-    if game.current_piece is None or game.game_over:
-        return []
 
-    best_score = float("-inf")
-    best_rotation = 0
-    best_col_offset = 0
+def _surface(game: TetrisGame) -> _Surface:
+    """Surface of the live board, from the features TetrisGame tracks."""
+    return _make_surface(
+        game.column_heights, game.row_fill_counts, game.hole_count, game.width
+    )
+
+
+def _surface_from_rows(rows: Sequence[int], width: int, height: int) -> _Surface:
+    """Surface of a simulated board, rebuilt from its row bitmasks."""
+    row_fill = tuple(bin(mask).count("1") for mask in rows)
+    heights, holes = _heights_and_holes(rows, width, height, sum(row_fill))
+    return _make_surface(tuple(heights), row_fill, holes, width)
+
+
+def _score_placement(
+    surface: _Surface,
+    landed: Piece,
+    width: int,
+    height: int,
+    weights: Weights = DEFAULT_WEIGHTS,
+) -> float:
+    """Score a landed piece as a delta from the board surface.
+
+    Only the piece's cells and their neighbouring columns are visited.
+    Holes follow from heights: every column holds exactly ``height`` cells at
+    or below its top block, so holes = aggregate height - filled cells.
+    """
+    heights = surface.heights
+    raised = {}  # column -> new height
+    added = {}   # row -> cells added
+    for r, c in landed.cells:
+        if 0 <= r < height:
+            added[r] = added.get(r, 0) + 1
+            h = height - r
+            if h > raised.get(c, heights[c]):
+                raised[c] = h
+
+    gain = sum(h - heights[c] for c, h in raised.items())
+    lines = surface.lines + sum(
+        1 for r, n in added.items() if surface.row_fill[r] + n == width
+    )
+    bumpiness = surface.bumpiness
+    for i in {j for c in raised for j in (c - 1, c) if 0 <= j < width - 1}:
+        left = raised.get(i, heights[i])
+        right = raised.get(i + 1, heights[i + 1])
+        bumpiness += abs(left - right) - abs(heights[i] - heights[i + 1])
+
+    return _evaluate(
+        surface.agg_height + gain,
+        lines,
+        surface.holes + gain - sum(added.values()),
+        bumpiness,
+        weights,
+    )
+
+
+def _score_candidates_numpy(
+    rows: Sequence[int],
+    width: int,
+    height: int,
+    landed: List[Piece],
+    weights: Weights = DEFAULT_WEIGHTS,
+) -> List[float]:
+    """Score every landed candidate in one batched NumPy pass."""
+    base = np.array(
+        [[(mask >> c) & 1 for c in range(width)] for mask in rows], dtype=bool
+    )
+    boards = np.repeat(base[np.newaxis], len(landed), axis=0)
+
+    # Lock every landed piece into its own board with a single scatter
+    ks, rs, cs = [], [], []
+    for k, piece in enumerate(landed):
+        for r, c in piece.cells:
+            if 0 <= r < height:
+                ks.append(k)
+                rs.append(r)
+                cs.append(c)
+    boards[ks, rs, cs] = True
+
+    # Column height: distance from the first filled row to the floor
+    top = boards.argmax(axis=1)
+    col_heights = np.where(boards.any(axis=1), height - top, 0)
+    agg_height = col_heights.sum(axis=1)
+    lines = boards.all(axis=2).sum(axis=1)
+    # Holes: empty cells below the first filled cell of their column
+    covered = np.logical_or.accumulate(boards, axis=1)
+    holes = (covered & ~boards).sum(axis=(1, 2))
+    bumpiness = np.abs(np.diff(col_heights, axis=1)).sum(axis=1)
+
+    return _evaluate(agg_height, lines, holes, bumpiness, weights).tolist()
+
+
+class Placement(NamedTuple):
+    """Chosen placement, relative to the piece's current position.
+
+    ``landed`` and ``actions`` are the lock position and the path to it
+    from the move generator.
+    """
+
+    rotation: int
+    col_offset: int
+    score: float
+    landed: Piece
+    actions: Tuple[Action, ...]
+
 
-    piece = game.current_piece
+class _SearchTimeout(Exception):
+    pass
 
+
+# Value of a position where the next piece cannot spawn
+_GAME_OVER_SCORE = -1e9
+
+
+def _candidates(
+    rows: Sequence[int], width: int, height: int, piece: Piece
+) -> List[Tuple[int, int, Piece]]:
+    """Straight drops of ``piece`` as (rotation, col_offset, landed piece).
+
+    Placements landing on the same cells as an earlier one are skipped, so
+    symmetric rotations are only simulated once.
+    """
+    found = []
+    seen = set()
     for rot in range(4):
-        rotated = Piece(piece.name, piece.row, piece.col, rot)
-
-        # Find valid column range for the rotated piece
-        cells = rotated.cells
-        min_c = min(c for _, c in cells)
-        max_c = max(c for _, c in cells)
-
-        for col_offset in range(-min_c, game.width - max_c):
-            candidate = Piece(piece.name, piece.row, piece.col + col_offset, rot)
-
-            # Check if the candidate fits at spawn position
-            fits = True
-            for r, c in candidate.cells:
-                if c < 0 or c >= game.width:
-                    fits = False
-                    break
-                if r >= 0 and r < game.height and game.board[r][c] is not None:
-                    fits = False
-                    break
-            if not fits:
+        shape_piece = Piece(piece.name, piece.row, 0, rot)
+        min_c = min(c for _, c in shape_piece.cells)
+        max_c = max(c for _, c in shape_piece.cells)
+        for col in range(-min_c, width - max_c):
+            candidate = Piece(piece.name, piece.row, col, rot)
+            if not _fits_rows(rows, width, height, candidate):
+                continue
+            landed = _land_rows(rows, height, candidate)
+            key = frozenset(landed.cells)
+            if key in seen:
                 continue
+            seen.add(key)
+            found.append((rot, col - piece.col, landed))
+    return found
+
+
+class _Search:
+    """One depth-limited search over a fixed piece sequence."""
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        backend: str,
+        beam_width: Optional[int],
+        unknown: Sequence[str],
+        deadline: Optional[float],
+        cancel: Optional[threading.Event] = None,
+        weights: Weights = DEFAULT_WEIGHTS,
+    ):
+        self.width = width
+        self.height = height
+        self.backend = backend
+        self.beam_width = beam_width
+        self.unknown = tuple(unknown)
+        self.deadline = deadline
+        self.cancel = cancel
+        self.weights = weights
+        self.spawn_col = (width - 4) // 2
+
+    def _scores(self, rows, surface, landed: List[Piece]) -> List[float]:
+        if self.backend == "numpy" and landed:
+            return _score_candidates_numpy(
+                rows, self.width, self.height, landed, self.weights
+            )
+        if surface is None:
+            surface = _surface_from_rows(rows, self.width, self.height)
+        return [
+            _score_placement(surface, p, self.width, self.height, self.weights)
+            for p in landed
+        ]
+
+    def _expand(self, rows, surface, piece: Piece, rest: tuple, candidates=None):
+        """Best (value, index) over the candidates of ``piece``, or None."""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise _SearchTimeout()
+        if self.cancel is not None and self.cancel.is_set():
+            raise _SearchTimeout()
+
+        if candidates is None:
+            candidates = _candidates(rows, self.width, self.height, piece)
+        if not candidates:
+            return None, candidates
+        scores = self._scores(rows, surface, [landed for _, _, landed in candidates])
+        if not rest:
+            best = max(range(len(scores)), key=scores.__getitem__)
+            return (scores[best], best), candidates
+
+        # Only the most promising placements are searched deeper
+        order = sorted(range(len(scores)), key=lambda i: -scores[i])
+        if self.beam_width is not None:
+            order = sorted(order[: self.beam_width])
+        best = None
+        for i in order:
+            next_rows, cleared = _lock_rows(rows, self.width, candidates[i][2])
+            value = self.weights.lines * cleared + self._value(next_rows, rest)
+            if best is None or value > best[0]:
+                best = (value, i)
+        return best, candidates
+
+    def _value(self, rows: Tuple[int, ...], pieces: tuple) -> float:
+        """Best achievable score for ``pieces`` on ``rows`` (None = unknown piece)."""
+        key = (rows, self.width, pieces, self.unknown, self.beam_width, self.weights)
+        value = _TRANSPOSITIONS.get(key)
+        if value is not None:
+            return value
+
+        name, rest = pieces[0], pieces[1:]
+        names = self.unknown if name is None else (name,)
+        total = 0.0
+        for candidate_name in names:
+            spawn = Piece(candidate_name, 0, self.spawn_col)
+            best, _ = self._expand(rows, None, spawn, rest)
+            # No room to spawn: the game would be over
+            total += _GAME_OVER_SCORE if best is None else best[0]
+        value = total / len(names)
+
+        if len(_TRANSPOSITIONS) >= _TRANSPOSITION_LIMIT:
+            _TRANSPOSITIONS.clear()
+        _TRANSPOSITIONS[key] = value
+        return value
+
+    def best_placement(self, rows, surface, piece: Piece, upcoming: tuple, moves):
+        candidates = [
+            (move.landed.rotation, move.landed.col - piece.col, move.landed)
+            for move in moves
+        ]
+        best, _ = self._expand(rows, surface, piece, upcoming, candidates)
+        if best is None:
+            return None
+        score, index = best
+        rot, col_offset, landed = candidates[index]
+        return Placement(rot, col_offset, score, landed, moves[index].actions)
+
 
-            score = _simulate_placement(game, candidate)
-            if score > best_score:
-                best_score = score
-                best_rotation = rot
-                best_col_offset = col_offset
-
-    # Build action sequence
-    actions: list[Action] = []
-
-    # Rotations
-    rotations_needed = (best_rotation - piece.rotation) % 4
-    if rotations_needed == 3:
-        actions.append(Action.ROTATE_CCW)
-    else:
-        actions.extend([Action.ROTATE_CW] * rotations_needed)
-
-    # Horizontal movement
-    if best_col_offset > 0:
-        actions.extend([Action.RIGHT] * best_col_offset)
-    elif best_col_offset < 0:
-        actions.extend([Action.LEFT] * abs(best_col_offset))
-
-    actions.append(Action.DROP)
-    return actions
+def plan_placement(
+    rows: Sequence[int],
+    width: int,
+    height: int,
+    piece: Piece,
+    upcoming: Sequence[Optional[str]] = (),
+    bag: Sequence[str] = (),
+    backend: Optional[str] = None,
+    beam_width: Optional[int] = DEFAULT_BEAM_WIDTH,
+    time_budget: Optional[float] = DEFAULT_TIME_BUDGET,
+    surface: Optional[_Surface] = None,
+    cancel: Optional[threading.Event] = None,
+    weights: Optional[Weights] = None,
+) -> Optional[Placement]:
+    """Choose where to drop ``piece`` on the board given by ``rows``.
+
+    ``upcoming`` lists the names of the pieces that follow, with None for
+    pieces not shown yet; those are averaged over ``bag`` (or all pieces when
+    the bag is empty). Depths are searched one at a time and the deepest
+    result finished within ``time_budget`` seconds is returned; the one-piece
+    search always completes. Setting ``cancel`` stops the deeper searches
+    the same way. Returns None when the piece has no room to drop.
+
+    The current piece's placements come from the move generator, so tucks
+    and kicked spins are considered; the pieces after it are only tried as
+    straight drops.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend == "numpy" and np is None:
+        raise ImportError("The numpy backend requires NumPy to be installed")
+
+    rows = tuple(rows)
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    unknown = tuple(sorted(set(bag))) or tuple(PIECE_NAMES)
+    upcoming = tuple(upcoming)
+    moves = reachable_placements(rows, width, height, piece)
+
+    result = None
+    for depth in range(len(upcoming) + 1):
+        search = _Search(
+            width, height, backend, beam_width, unknown,
+            deadline if depth else None,
+            cancel if depth else None,
+            weights or DEFAULT_WEIGHTS,
+        )
+        try:
+            placement = search.best_placement(
+                rows, surface, piece, upcoming[:depth], moves
+            )
+        except _SearchTimeout:
+            break
+        if placement is None:
+            return result
+        result = placement
+    return result
+
+
+def _upcoming(next_name: str, depth: int) -> Tuple[Optional[str], ...]:
+    """Pieces after the current one for a ``depth``-piece search."""
+    return ((next_name,) + (None,) * max(depth - 2, 0))[: max(depth - 1, 0)]
+
+
+def _placement_actions(placement: Optional[Placement]) -> list[Action]:
+    """The path to a placement, or a plain drop when there is none."""
+    if placement is None:
+        return [Action.DROP]
+    return list(placement.actions)
+
+
+def compute_best_actions(
+    game: TetrisGame,
+    backend: Optional[str] = None,
+    depth: int = DEFAULT_DEPTH,
+    beam_width: Optional[int] = DEFAULT_BEAM_WIDTH,
+    time_budget: Optional[float] = DEFAULT_TIME_BUDGET,
+    weights: Optional[Weights] = None,
+) -> list[Action]:
+    """Compute the sequence of actions to reach the best placement.
+
+    ``depth`` is the number of pieces searched: 1 is a greedy search of the
+    current piece, 2 adds the next-piece preview and deeper searches average
+    over the pieces left in the bag. ``backend`` selects the scoring
+    implementation ("python" or "numpy"); ``weights`` overrides the default
+    heuristic weights (see load_weights).
+    """
+    if game.current_piece is None or game.game_over:
+        return []
+
+    placement = plan_placement(
+        game.row_masks,
+        game.width,
+        game.height,
+        game.current_piece,
+        upcoming=_upcoming(game.next_piece_name, depth),
+        bag=game.bag,
+        backend=backend,
+        beam_width=beam_width,
+        time_budget=time_budget,
+        surface=_surface(game),
+        weights=weights,
+    )
+    return _placement_actions(placement)
@@ -1,6 +1,6 @@
 import random
 from enum import Enum
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 # Standard Tetris pieces (SRS) as lists of (row, col) offsets from top-left of a 4x4 bounding box
 # Each piece has 4 rotations
@@ -64,6 +64,48 @@ PIECE_NAMES = list(_PIECE_DEFS.keys())
 
 Cell = Optional[Tuple[int, int, int]]  # RGB or None
 
+# Compact color encoding for the board: 0 = empty, 1..7 = index into PIECE_NAMES + 1
+_COLOR_INDEX = {name: i + 1 for i, name in enumerate(PIECE_NAMES)}
+_INDEX_COLOR: List[Cell] = [None] + [PIECE_COLORS[name] for name in PIECE_NAMES]
+
+
+class _Shape(NamedTuple):
+    """Precomputed geometry of one (name, rotation)."""
+
+    cells: Tuple[Tuple[int, int], ...]       # (drow, dcol) offsets
+    row_offsets: Tuple[int, ...]             # distinct drow values, ascending
+    col_offsets: Tuple[int, ...]             # distinct dcol values, ascending
+    min_dc: int
+    max_dc: int
+    row_masks: Tuple[Tuple[int, int], ...]   # (drow, column bitmask relative to min_dc)
+
+
+def _build_shapes() -> Dict[Tuple[str, int], _Shape]:
+    shapes = {}
+    for name, rotations in _PIECE_DEFS.items():
+        for rot, offsets in enumerate(rotations):
+            min_dc = min(dc for _, dc in offsets)
+            max_dc = max(dc for _, dc in offsets)
+            masks: Dict[int, int] = {}
+            for dr, dc in offsets:
+                masks[dr] = masks.get(dr, 0) | (1 << (dc - min_dc))
+            shapes[(name, rot)] = _Shape(
+                cells=tuple(offsets),
+                row_offsets=tuple(sorted(masks)),
+                col_offsets=tuple(sorted({dc for _, dc in offsets})),
+                min_dc=min_dc,
+                max_dc=max_dc,
+                row_masks=tuple(sorted(masks.items())),
+            )
+    return shapes
+
+
+_SHAPES = _build_shapes()
+
+# Interned Piece instances keyed by (name, row, col, rotation)
+_PIECE_CACHE: Dict[Tuple[str, int, int, int], "Piece"] = {}
+_PIECE_CACHE_LIMIT = 1 << 16
+
 
 class Action(Enum):
     LEFT = "left"
@@ -74,21 +116,74 @@ class Action(Enum):
     ROTATE_CCW = "rotate_ccw"
 
 
+class Change(Enum):
+    """Kinds of GameEvent."""
+
+    MOVED = "moved"           # piece shifted, rotated or fell a row
+    LOCKED = "locked"         # piece locked (and the next one spawned)
+    CLEARED = "cleared"       # full rows removed
+    LEVEL_UP = "level_up"
+    GAME_OVER = "game_over"
+    RESET = "reset"           # whole state replaced: reset, restore or board assignment
+
+
 class Piece:
-    def __init__(self, name: str, row: int, col: int, rotation: int = 0):
-        self.name = name
-        self.row = row
-        self.col = col
-        self.rotation = rotation % 4
-        self.color = PIECE_COLORS[name]
+    """Immutable piece placement.
+
+    Instances are interned by (name, row, col, rotation): moving or rotating
+    into a previously seen state returns the cached object and its cells
+    instead of allocating a new one. Equality and hashing go by the same
+    key, so pieces made either side of a cache flush still compare equal.
+    """
+
+    __slots__ = ("name", "row", "col", "rotation", "color", "cells", "_shape", "_hash")
+
+    def __new__(cls, name: str, row: int, col: int, rotation: int = 0):
+        rotation %= 4
+        key = (name, row, col, rotation)
+        piece = _PIECE_CACHE.get(key)
+        if piece is not None:
+            return piece
+        if len(_PIECE_CACHE) >= _PIECE_CACHE_LIMIT:
+            _PIECE_CACHE.clear()
+        shape = _SHAPES[(name, rotation)]
+        piece = object.__new__(cls)
+        init = object.__setattr__
+        init(piece, "name", name)
+        init(piece, "row", row)
+        init(piece, "col", col)
+        init(piece, "rotation", rotation)
+        init(piece, "color", PIECE_COLORS[name])
+        # Absolute board positions of this piece's blocks
+        init(piece, "cells", tuple((row + dr, col + dc) for dr, dc in shape.cells))
+        init(piece, "_shape", shape)
+        init(piece, "_hash", hash(key))
+        _PIECE_CACHE[key] = piece
+        return piece
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Piece is immutable")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Piece):
+            return NotImplemented
+        return (
+            self.name == other.name
+            and self.row == other.row
+            and self.col == other.col
+            and self.rotation == other.rotation
+        )
 
-    @property
-    def cells(self) -> List[Tuple[int, int]]:
-        """Absolute board positions of this piece's blocks."""
-        return [
-            (self.row + dr, self.col + dc)
-            for dr, dc in _PIECE_DEFS[self.name][self.rotation]
-        ]
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        return (Piece, (self.name, self.row, self.col, self.rotation))
+
+    def __repr__(self) -> str:
+        return f"Piece({self.name!r}, {self.row}, {self.col}, {self.rotation})"
 
     def moved(self, drow: int, dcol: int) -> "Piece":
         return Piece(self.name, self.row + drow, self.col + dcol, self.rotation)
@@ -97,15 +192,244 @@ class Piece:
         return Piece(self.name, self.row, self.col, self.rotation + direction)
 
 
+# --- Bitboard helpers (shared with the demo AI's search) ---
+
+
+def _fits_rows(rows: Sequence[int], width: int, height: int, piece: Piece) -> bool:
+    """Whether ``piece`` is inside the walls and clear of the occupied bits."""
+    shape = piece._shape
+    col = piece.col + shape.min_dc
+    if col < 0 or piece.col + shape.max_dc >= width:
+        return False
+    for dr, mask in shape.row_masks:
+        r = piece.row + dr
+        if r >= height:
+            return False
+        if r >= 0 and rows[r] & (mask << col):
+            return False
+    return True
+
+
+# --- SRS wall kicks ---
+
+# Kick tests from the SRS guideline as (x, y) with y pointing up, keyed by
+# (from rotation, to rotation); 0 = spawn, 1 = R (clockwise), 2, 3 = L
+_SRS_KICKS_JLSTZ = {
+    (0, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    (1, 0): ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    (1, 2): ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    (2, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    (2, 3): ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+    (3, 2): ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+    (3, 0): ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+    (0, 3): ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+}
+_SRS_KICKS_I = {
+    (0, 1): ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    (1, 0): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (1, 2): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+    (2, 1): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (2, 3): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (3, 2): ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    (3, 0): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (0, 3): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+}
+
+
+def _srs_states(name: str) -> List[List[Tuple[int, int]]]:
+    """The four SRS rotation states of a piece within its rotation box.
+
+    JLSTZ turn inside a 3x3 box, O inside 2x2 (so not at all) and I inside
+    4x4, where it spawns on the second row.
+    """
+    size = {"I": 4, "O": 2}.get(name, 3)
+    cells = [(r + (name == "I"), c) for r, c in _PIECE_DEFS[name][0]]
+    states = []
+    for _ in range(4):
+        states.append(cells)
+        cells = [(c, size - 1 - r) for r, c in cells]
+    return states
+
+
+def _build_kicks() -> Dict[Tuple[str, int, int], Tuple[Tuple[int, int], ...]]:
+    """(name, from, direction) -> (drow, dcol) moves of the piece origin.
+
+    _PIECE_DEFS keeps each rotation packed against the top-left of its box,
+    so every state sits at a fixed offset from its SRS position; folding
+    the offset difference into each kick makes the rotated cells match SRS.
+    """
+    kicks = {}
+    for name in _PIECE_DEFS:
+        offsets = []
+        for cells, srs in zip(_PIECE_DEFS[name], _srs_states(name)):
+            offsets.append((
+                min(r for r, _ in cells) - min(r for r, _ in srs),
+                min(c for _, c in cells) - min(c for _, c in srs),
+            ))
+        table = _SRS_KICKS_I if name == "I" else _SRS_KICKS_JLSTZ
+        for (start, end), tests in table.items():
+            (r0, c0), (r1, c1) = offsets[start], offsets[end]
+            if name == "O":
+                tests = tests[:1]
+            kicks[(name, start, (end - start) % 4)] = tuple(
+                (r0 - r1 - y, c0 - c1 + x) for x, y in tests
+            )
+    return kicks
+
+
+_KICKS = _build_kicks()
+
+
+def _rotate_rows(
+    rows: Sequence[int], width: int, height: int, piece: Piece, direction: int
+) -> Optional[Piece]:
+    """``piece`` rotated by ``direction`` with SRS wall kicks, or None if blocked."""
+    rotation = (piece.rotation + direction) % 4
+    shape = _SHAPES[(piece.name, rotation)]
+    for drow, dcol in _KICKS[(piece.name, piece.rotation, direction % 4)]:
+        row = piece.row + drow
+        col = piece.col + dcol
+        shift = col + shape.min_dc
+        if shift < 0 or col + shape.max_dc >= width:
+            continue
+        for dr, mask in shape.row_masks:
+            r = row + dr
+            if r >= height or (r >= 0 and rows[r] & (mask << shift)):
+                break
+        else:
+            return Piece(piece.name, row, col, rotation)
+    return None
+
+
+def _land_rows(rows: Sequence[int], height: int, piece: Piece) -> Piece:
+    """Lowest position reachable by moving ``piece`` straight down."""
+    shape = piece._shape
+    shift = piece.col + shape.min_dc
+    row = piece.row
+    while True:
+        below = row + 1
+        for dr, mask in shape.row_masks:
+            r = below + dr
+            if r >= height or (r >= 0 and rows[r] & (mask << shift)):
+                return Piece(piece.name, row, piece.col, piece.rotation)
+        row = below
+
+
+def _lock_rows(
+    rows: Sequence[int], width: int, piece: Piece
+) -> Tuple[Tuple[int, ...], int]:
+    """Lock ``piece`` into ``rows`` and clear full lines.
+
+    Returns the new rows and the number of lines cleared. Cells above the
+    top of the board are dropped, as in TetrisGame._lock_piece.
+    """
+    new_rows = list(rows)
+    shift = piece.col + piece._shape.min_dc
+    for dr, mask in piece._shape.row_masks:
+        r = piece.row + dr
+        if r >= 0:
+            new_rows[r] |= mask << shift
+    full = (1 << width) - 1
+    if full not in new_rows:
+        return tuple(new_rows), 0
+    kept = [mask for mask in new_rows if mask != full]
+    cleared = len(new_rows) - len(kept)
+    return (0,) * cleared + tuple(kept), cleared
+
+
+def _heights_and_holes(
+    rows: Sequence[int], width: int, height: int, filled: int
+) -> Tuple[List[int], int]:
+    """Column heights of ``rows`` and the holes under them.
+
+    ``filled`` is the number of occupied cells on the board.
+    """
+    heights = [0] * width
+    full = (1 << width) - 1
+    seen = 0
+    for r, mask in enumerate(rows):
+        new = mask & ~seen
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = height - r
+            new ^= low
+        seen |= mask
+        if seen == full:
+            break
+    # Every column holds exactly `height` cells below its top, filled or not
+    return heights, sum(heights) - filled
+
+
+_LINE_POINTS = {0: 0, 1: 100, 2: 300, 3: 500, 4: 800}
+
+
+class GameSnapshot(NamedTuple):
+    """Immutable game state: a few hundred bytes, no per-cell objects.
+
+    Rows are occupancy bitmasks (as in TetrisGame.row_masks) and colors
+    one byte per cell, so unchanged row ints are shared between snapshots.
+    ``next_piece_name`` is None when it depends on a bag not yet drawn.
+    The RNG is not included: restoring continues the game's piece stream.
+    """
+
+    rows: Tuple[int, ...]
+    colors: bytes
+    score: int
+    lines_cleared: int
+    level: int
+    game_over: bool
+    piece: Optional["Piece"]
+    next_piece_name: Optional[str]
+    bag: Tuple[str, ...]
+
+
+class GameEvent(NamedTuple):
+    """One change to a TetrisGame, delivered to its subscribers.
+
+    ``piece`` is the piece that moved or locked; ``rows`` lists the cleared
+    row indices (counted before the clear). Events from a single update
+    share its ``version``.
+    """
+
+    change: Change
+    version: int
+    piece: Optional["Piece"] = None
+    rows: Tuple[int, ...] = ()
+
+
 class TetrisGame:
-    """Pure game logic — no rendering, no I/O."""
+    """Pure game logic — no rendering, no I/O.
+
+    The board is stored as a bitboard: one int per row with bit ``c`` set when
+    column ``c`` is occupied, plus a flat ``bytearray`` of color indices.
+    ``board`` is a lazily built list-of-lists view kept for renderers.
+
+    Surface features (column heights, per-row fill counts, hole count) are
+    kept up to date incrementally as pieces lock and lines clear.
+    ``board_generation`` goes up whenever the locked cells change, so views
+    of the board can be cached against it, and ``version`` goes up on every
+    change at all. Callbacks passed to subscribe() get a GameEvent for each
+    change once the update is complete.
+    """
 
-    def __init__(self, width: int = 10, height: int = 20):
+    def __init__(self, width: int = 10, height: int = 20, seed: Optional[int] = None):
         self.width = width
         self.height = height
-        self.board: List[List[Cell]] = [
-            [None] * width for _ in range(height)
-        ]
+        self.seed = seed
+        # Seeded games get their own RNG so piece sequences are reproducible
+        self._rng = random.Random(seed) if seed is not None else random
+        self._full_row = (1 << width) - 1
+        self.board_generation = 0
+        self.version = 0
+        self._subscribers: List[Callable[[GameEvent], None]] = []
+        self.reset()
+
+    def reset(self, seed: Optional[int] = None):
+        """Start a new game on the same board; ``seed`` reseeds the RNG."""
+        if seed is not None:
+            self.seed = seed
+            self._rng = random.Random(seed)
+        self._set_board([0] * self.height, bytearray(self.width * self.height))
         self.score = 0
         self.lines_cleared = 0
         self.level = 1
@@ -114,13 +438,171 @@ class TetrisGame:
         self.current_piece: Optional[Piece] = None
         self.next_piece_name: str = self._next_from_bag()
         self._spawn_piece()
+        self._changed(Change.RESET)
+
+    # --- Change notification ---
+
+    def subscribe(self, callback: Callable[[GameEvent], None]):
+        """Call ``callback`` with a GameEvent for every change from now on."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[GameEvent], None]):
+        self._subscribers.remove(callback)
+
+    def _changed(self, *changes: Change, piece: Optional[Piece] = None, rows=()):
+        """Bump the version and tell subscribers about ``changes``."""
+        self.version += 1
+        if self._subscribers:
+            self._notify(changes, piece, rows)
+
+    def _notify(self, changes: Sequence[Change], piece: Optional[Piece], rows=()):
+        for change in changes:
+            event = GameEvent(change, self.version, piece, rows)
+            for callback in tuple(self._subscribers):
+                callback(event)
+
+    # --- Snapshots ---
+
+    def snapshot(self) -> GameSnapshot:
+        return GameSnapshot(
+            tuple(self._rows), bytes(self._colors), self.score, self.lines_cleared,
+            self.level, self.game_over, self.current_piece, self.next_piece_name,
+            tuple(self._bag),
+        )
+
+    def restore(self, snapshot: GameSnapshot):
+        """Put the game back into ``snapshot``'s state.
+
+        Pieces a snapshot left undecided (see apply_placement) are drawn
+        from the game's own bag and RNG, and spawned if needed.
+        """
+        self._set_board(list(snapshot.rows), bytearray(snapshot.colors))
+        self.score = snapshot.score
+        self.lines_cleared = snapshot.lines_cleared
+        self.level = snapshot.level
+        self.game_over = snapshot.game_over
+        self.current_piece = snapshot.piece
+        self._bag = list(snapshot.bag)
+        self.next_piece_name = snapshot.next_piece_name or self._next_from_bag()
+        if self.current_piece is None and not self.game_over:
+            self._spawn_piece()
+        self._changed(Change.RESET)
+
+    def apply_placement(self, snapshot: GameSnapshot, piece: Piece) -> GameSnapshot:
+        """The snapshot after locking ``piece`` where it is, as a drop would.
+
+        Clears lines, scores and spawns the next piece without touching the
+        game or its RNG. Rows that don't change are shared with ``snapshot``.
+        Once the bag runs out, the pieces it would decide are left as None.
+        """
+        w = self.width
+        rows = list(snapshot.rows)
+        colors = bytearray(snapshot.colors)
+        index = _COLOR_INDEX[piece.name]
+        for r, c in piece.cells:
+            if 0 <= r < self.height and 0 <= c < w:
+                rows[r] |= 1 << c
+                colors[r * w + c] = index
+        cleared = 0
+        if self._full_row in rows:
+            keep = [r for r, mask in enumerate(rows) if mask != self._full_row]
+            cleared = self.height - len(keep)
+            rows = [0] * cleared + [rows[r] for r in keep]
+            colors = bytearray(cleared * w) + b"".join(colors[r * w:(r + 1) * w] for r in keep)
+
+        lines = snapshot.lines_cleared + cleared
+        score = snapshot.score + _LINE_POINTS.get(cleared, 800) * snapshot.level
+        name = snapshot.next_piece_name
+        bag = snapshot.bag
+        spawn = Piece(name, 0, (w - 4) // 2) if name is not None else None
+        game_over = spawn is not None and not _fits_rows(rows, w, self.height, spawn)
+        return GameSnapshot(
+            tuple(rows), bytes(colors), score, lines, 1 + lines // 10, game_over, spawn,
+            bag[-1] if bag else None, bag[:-1],
+        )
+
+    # --- Board views ---
+
+    @property
+    def board(self) -> List[List[Cell]]:
+        """Grid of RGB tuples (or None), materialized on demand and cached.
+
+        Treat it as read-only: edits are not reflected in the bitboard.
+        Assign a whole grid to replace the board contents instead.
+        """
+        if self._board_view is None:
+            w = self.width
+            colors = self._colors
+            self._board_view = [
+                [_INDEX_COLOR[i] for i in colors[r * w:(r + 1) * w]]
+                for r in range(self.height)
+            ]
+        return self._board_view
+
+    @board.setter
+    def board(self, grid: List[List[Cell]]):
+        color_index = {color: i for i, color in enumerate(_INDEX_COLOR)}
+        w = self.width
+        rows = [0] * self.height
+        colors = bytearray(w * self.height)
+        for r in range(self.height):
+            for c in range(w):
+                color = grid[r][c]
+                if color is not None:
+                    rows[r] |= 1 << c
+                    # Unknown colors fall back to a generic block color
+                    colors[r * w + c] = color_index.get(color, 1)
+        self._set_board(rows, colors)
+        self._changed(Change.RESET)
+
+    def _set_board(self, rows: List[int], colors: bytearray):
+        """Replace the bitboard and colors, and rebuild the derived features."""
+        self._rows = rows
+        self._colors = colors
+        self._board_view = None
+        self.board_generation += 1
+        self._row_fill = [bin(mask).count("1") for mask in rows]
+        self._recompute_heights()
+
+    @property
+    def row_masks(self) -> Tuple[int, ...]:
+        """Occupancy bitmask per row, top row first (bit c = column c)."""
+        return tuple(self._rows)
+
+    # --- Surface features ---
+
+    @property
+    def column_heights(self) -> Tuple[int, ...]:
+        """Height of each column, measured from the floor to its top block."""
+        return tuple(self._col_heights)
+
+    @property
+    def row_fill_counts(self) -> Tuple[int, ...]:
+        """Number of occupied cells in each row, top row first."""
+        return tuple(self._row_fill)
+
+    @property
+    def hole_count(self) -> int:
+        """Empty cells lying below the top block of their column."""
+        return self._holes
+
+    def _recompute_heights(self):
+        """Rebuild column heights and holes from the bitboard (O(height))."""
+        self._col_heights, self._holes = _heights_and_holes(
+            self._rows, self.width, self.height, sum(self._row_fill)
+        )
 
     # --- Bag randomizer (standard 7-bag) ---
 
+    @property
+    def bag(self) -> Tuple[str, ...]:
+        """Pieces left in the current bag after the preview, drawn from the end."""
+        return tuple(self._bag)
+
     def _next_from_bag(self) -> str:
         if not self._bag:
             self._bag = list(PIECE_NAMES)
-            random.shuffle(self._bag)
+            self._rng.shuffle(self._bag)
         return self._bag.pop()
 
     # --- Piece spawning ---
@@ -139,12 +621,7 @@ class TetrisGame:
     # --- Collision detection ---
 
     def _fits(self, piece: Piece) -> bool:
-        for r, c in piece.cells:
-            if c < 0 or c >= self.width or r >= self.height:
-                return False
-            if r >= 0 and self.board[r][c] is not None:
-                return False
-        return True
+        return _fits_rows(self._rows, self.width, self.height, piece)
 
     # --- Actions ---
 
@@ -172,22 +649,27 @@ class TetrisGame:
         candidate = self.current_piece.moved(drow, dcol)
         if self._fits(candidate):
             self.current_piece = candidate
+            # Inlined _changed(): moves are the hot path
+            self.version += 1
+            if self._subscribers:
+                self._notify((Change.MOVED,), candidate)
             return True
         return False
 
     def _try_rotate(self, direction: int) -> bool:
-        candidate = self.current_piece.rotated(direction)
-        # Try basic rotation, then wall kicks (offsets 0, ±1, ±2 columns)
-        for offset in [0, -1, 1, -2, 2]:
-            kicked = candidate.moved(0, offset)
-            if self._fits(kicked):
-                self.current_piece = kicked
-                return True
-        return False
+        rotated = _rotate_rows(
+            self._rows, self.width, self.height, self.current_piece, direction
+        )
+        if rotated is None:
+            return False
+        self.current_piece = rotated
+        self.version += 1
+        if self._subscribers:
+            self._notify((Change.MOVED,), rotated)
+        return True
 
     def _hard_drop(self):
-        while self._try_move(1, 0):
-            pass
+        self.current_piece = self._landing(self.current_piece)
         self._lock_piece()
 
     # --- Gravity tick ---
@@ -204,41 +686,72 @@ class TetrisGame:
     # --- Lock & clear ---
 
     def _lock_piece(self):
-        for r, c in self.current_piece.cells:
-            if 0 <= r < self.height and 0 <= c < self.width:
-                self.board[r][c] = self.current_piece.color
+        locked, level = self.current_piece, self.level
+        index = _COLOR_INDEX[locked.name]
+        w = self.width
+        heights = self._col_heights
+        for r, c in locked.cells:
+            if 0 <= r < self.height and 0 <= c < w:
+                self._rows[r] |= 1 << c
+                self._colors[r * w + c] = index
+                self._row_fill[r] += 1
+                # Holes = total height - filled cells, so the new cell removes
+                # one and any height gain adds the newly covered cells.
+                self._holes -= 1
+                h = self.height - r
+                if h > heights[c]:
+                    self._holes += h - heights[c]
+                    heights[c] = h
+        self._board_view = None
+        self.board_generation += 1
         cleared = self._clear_lines()
-        self._update_score(cleared)
+        self._update_score(len(cleared))
         self._spawn_piece()
 
-    def _clear_lines(self) -> int:
-        new_board = [
-            row for row in self.board if any(cell is None for cell in row)
-        ]
-        cleared = self.height - len(new_board)
-        for _ in range(cleared):
-            new_board.insert(0, [None] * self.width)
-        self.board = new_board
-        return cleared
+        changes = [Change.LOCKED]
+        if cleared:
+            changes.append(Change.CLEARED)
+        if self.level > level:
+            changes.append(Change.LEVEL_UP)
+        if self.game_over:
+            changes.append(Change.GAME_OVER)
+        self._changed(*changes, piece=locked, rows=cleared)
+
+    def _clear_lines(self) -> Tuple[int, ...]:
+        """Remove full rows and return their indices."""
+        full = self._full_row
+        if full not in self._rows:
+            return ()
+        w = self.width
+        keep = [r for r, mask in enumerate(self._rows) if mask != full]
+        removed = tuple(r for r, mask in enumerate(self._rows) if mask == full)
+        cleared = len(removed)
+        colors = bytearray(cleared * w)
+        for r in keep:
+            colors += self._colors[r * w:(r + 1) * w]
+        self._rows = [0] * cleared + [self._rows[r] for r in keep]
+        self._colors = colors
+        self._board_view = None
+        self._row_fill = [0] * cleared + [self._row_fill[r] for r in keep]
+        self._recompute_heights()
+        return removed
 
     def _update_score(self, cleared: int):
         self.lines_cleared += cleared
-        points = {0: 0, 1: 100, 2: 300, 3: 500, 4: 800}
-        self.score += points.get(cleared, 800) * self.level
+        self.score += _LINE_POINTS.get(cleared, 800) * self.level
         self.level = 1 + self.lines_cleared // 10
 
     # --- Query helpers ---
 
+    def _landing(self, piece: Piece) -> Piece:
+        """Lowest position reachable by moving ``piece`` straight down."""
+        return _land_rows(self._rows, self.height, piece)
+
     def get_drop_ghost(self) -> Optional[Piece]:
         """Where the current piece would land."""
         if self.current_piece is None:
             return None
-        ghost = self.current_piece
-        while True:
-            moved = ghost.moved(1, 0)
-            if not self._fits(moved):
-                return ghost
-            ghost = moved
+        return self._landing(self.current_piece)
 
     @property
     def gravity_interval(self) -> float:
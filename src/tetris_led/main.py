@@ -1,24 +1,29 @@
 """Main entry point: play Tetris with a controller or watch the demo AI.
 
 Usage:
-    tetris-led play   [--device /dev/input/js0] [--terminal]
-    tetris-led demo   [--terminal]
+    tetris-led play   [--device /dev/input/js0] [--terminal] [--record FILE]
+    tetris-led replay FILE [--speed 1.0 | --max-speed] [--terminal]
+    tetris-led demo   [--terminal] [--backend numpy]
+    tetris-led bench  [--games 10] [--seed 0] [--backend numpy] [--output report.json]
+    tetris-led tune   [--generations 10] [--output weights.json]
 
 Flags:
     --terminal   Use ANSI terminal rendering instead of LED matrix
-    --device     Joystick device path (default: /dev/input/js0)
+    --device     Joystick device path (default: follow controllers as they connect)
     --width      Board width in cells (default: 10)
     --height     Board height in cells (default: 20)
 """
 
 import argparse
 import queue
+import random
 import signal
 import sys
 import threading
 import time
+from typing import List, Optional, Tuple
 
-from tetris_led.game import Action, TetrisGame
+from tetris_led.game import Action, Change, GameEvent, TetrisGame
 
 
 def _make_renderer(args):
@@ -36,37 +41,90 @@ def _make_renderer(args):
         )
 
 
+def _make_metrics(args):
+    """A Metrics collector if --stats or --stats-output was given, else None."""
+    if not (args.stats or args.stats_output):
+        return None
+    from tetris_led.metrics import Metrics
+    return Metrics(output=args.stats_output)
+
+
 def _run_play(args):
-    """Play mode: human controls via 8BitDo SN30 Pro controller."""
+    """Play mode: human controls via 8BitDo SN30 Pro controller.
+
+    The loop sleeps on the action queue until the next deadline (gravity
+    tick, DAS repeat or pending render), so inputs are handled as soon as
+    they arrive and an idle game only wakes up for gravity. All inputs due
+    in a frame are applied before rendering, and at most one frame is drawn
+    per RENDER_INTERVAL.
+
+    Without --device, controllers are picked up (and picked up again after
+    a Bluetooth drop) by a hotplug DeviceManager.
+
+    With --record the raw controller events and the game seed are saved, and
+    the ``replay`` mode feeds such a file back in place of the controller.
+    A replay runs the game clock (gravity and DAS) on the recording's own
+    event times rather than the wall clock, so it ends in the same state
+    whatever the playback speed.
+    """
     from bt_8bitdo_30snpro.controller import (
+        AXIS_INDEX,
+        EMPTY_STATE,
         ButtonCallbacks,
         Controller,
+        ControllerState,
         StickCallbacks,
     )
+    from bt_8bitdo_30snpro.hotplug import DeviceManager
+    from bt_8bitdo_30snpro.recording import (
+        EventRecorder,
+        ReplayController,
+        read_recording,
+    )
 
-    game = TetrisGame(width=args.width, height=args.height)
+    replaying = args.mode == "replay"
+    if replaying:
+        metadata, _ = read_recording(args.recording)
+        seed = metadata.get("seed")
+        width = metadata.get("width", args.width)
+        height = metadata.get("height", args.height)
+    else:
+        seed = args.seed
+        if seed is None and args.record:
+            seed = random.randrange(1 << 32)  # replays need a known seed
+        width, height = args.width, args.height
+    restarts = 0
+
+    game = TetrisGame(width=width, height=height, seed=seed)
     renderer = _make_renderer(args)
-    lock = threading.Lock()
+    metrics = renderer.metrics = _make_metrics(args)
     action_queue = queue.Queue()
     running = True
 
-    # DAS (Delayed Auto Shift) state for held directions
+    # DAS (Delayed Auto Shift) for held directions, timed from the device's
+    # own event timestamps in the controller state snapshot
     DAS_DELAY = 0.18       # initial delay before auto-repeat starts
     DAS_REPEAT = 0.05      # repeat interval while held
-    held_actions: dict[Action, float] = {}  # action -> time when next repeat fires
-    held_lock = threading.Lock()
+    # (action, axis, sign): the d-pad, plus the left stick's direction after
+    # the controller's stick filter (deadzone and hysteresis)
+    DAS_DIRECTIONS = (
+        (Action.LEFT, AXIS_INDEX["dpad_x"], -1),
+        (Action.RIGHT, AXIS_INDEX["dpad_x"], 1),
+        (Action.DOWN, AXIS_INDEX["dpad_y"], 1),
+        (Action.LEFT, AXIS_INDEX["left_x"], -1),
+        (Action.RIGHT, AXIS_INDEX["left_x"], 1),
+        (Action.DOWN, AXIS_INDEX["left_y"], 1),
+    )
+    das_fired: dict[int, Tuple[float, int]] = {}  # direction -> (hold start, repeats)
+    das_blocked: dict[int, float] = {}  # holds that spanned a piece lock
+
+    RENDER_INTERVAL = 1 / 60  # at most one frame per display refresh
 
     def _direction_action(act: Action):
-        """Callback for d-pad directions — supports hold-to-repeat."""
+        """Callback for d-pad/stick directions; repeats come from the state snapshot."""
         def callback(value: int):
-            with held_lock:
-                if value != 0:
-                    # Button pressed: queue immediate action, schedule DAS
-                    action_queue.put(act)
-                    held_actions[act] = time.monotonic() + DAS_DELAY
-                else:
-                    # Button released: stop repeating
-                    held_actions.pop(act, None)
+            if value != 0:
+                action_queue.put(act)
         return callback
 
     def _button_action(act: Action):
@@ -78,62 +136,98 @@ def _run_play(args):
         return callback
 
     def _start_callback(value: int):
-        nonlocal running
         if value:
             action_queue.put("restart")
 
     def _select_callback(value: int):
-        nonlocal running
         if value:
-            running = False
+            action_queue.put("quit")
 
     def _flush_queue():
-        """Drain all pending actions and clear DAS state (called on piece lock)."""
+        """Drain all pending actions and stop current DAS holds (called on piece lock)."""
         while not action_queue.empty():
             try:
-                action_queue.get_nowait()
+                item = action_queue.get_nowait()
             except queue.Empty:
                 break
-        with held_lock:
-            held_actions.clear()
-
-    def _process_one_action():
-        """Process a single queued action and return whether something changed."""
-        try:
-            act = action_queue.get_nowait()
-        except queue.Empty:
-            return False
-        with lock:
-            if act == "restart":
-                if game.game_over:
-                    game.__init__(width=args.width, height=args.height)
-                    return True
-            elif not game.game_over:
-                old_piece = game.current_piece
-                game.action(act)
-                # Piece locked (hard drop or landed) — flush stale inputs
-                if game.current_piece is not old_piece:
-                    _flush_queue()
-                return True
-        return False
-
-    def _process_das():
-        """Generate auto-repeat actions for held directions."""
-        now = time.monotonic()
-        with held_lock:
-            for act, next_time in list(held_actions.items()):
-                if now >= next_time:
-                    action_queue.put(act)
-                    held_actions[act] = now + DAS_REPEAT
-
-    controller = Controller(
-        device=args.device or None,
+            if item == "quit":
+                action_queue.put(item)
+                break
+        state = _controller_state()
+        for key, (_, axis, _) in enumerate(DAS_DIRECTIONS):
+            das_blocked[key] = state.moved_at[axis]
+        das_fired.clear()
+
+    def _on_change(event: GameEvent):
+        # Piece locked (hard drop or gravity) — flush stale inputs
+        if event.change is Change.LOCKED:
+            _flush_queue()
+
+    game.subscribe(_on_change)
+
+    def _apply(act):
+        """Apply one queued item; changes show up in ``game.version``."""
+        nonlocal running, restarts
+        if act == "quit":
+            running = False
+        elif act == "restart":
+            if game.game_over:
+                restarts += 1
+                game.reset(seed=None if seed is None else seed + restarts)
+        elif not game.game_over:
+            game.action(act)
+
+    def _das(
+        state: ControllerState, now: float, offset: Optional[float] = None
+    ) -> Tuple[List[Action], float]:
+        """Auto-repeats due for held directions, and when the next one is due.
+
+        Repeats sit on a fixed grid from the device timestamp of the press
+        edge, so they don't drift with loop wakeups. A late loop fires one
+        repeat rather than a burst. ``now`` is monotonic time unless
+        ``offset`` (device clock -> ``now``'s clock) says otherwise.
+        """
+        if offset is None:
+            offset = state.received - state.time  # device clock -> monotonic
+        due: List[Action] = []
+        next_at = float("inf")
+        for key, (act, axis, sign) in enumerate(DAS_DIRECTIONS):
+            if state.directions[axis] != sign:
+                das_fired.pop(key, None)
+                das_blocked.pop(key, None)
+                continue
+            since = state.moved_at[axis]
+            if das_blocked.get(key) == since:
+                continue
+            start, fired = das_fired.get(key, (since, 0))
+            if start != since:
+                fired = 0
+            first = since + offset + DAS_DELAY
+            if now >= first:
+                # Nudged so a call exactly on a repeat's deadline counts it
+                count = int((now - first) / DAS_REPEAT + 1e-6) + 1
+                if count > fired:
+                    due.append(act)
+                    fired = count
+            das_fired[key] = (since, fired)
+            next_at = min(next_at, first + fired * DAS_REPEAT)
+        return due, next_at
+
+    callbacks = dict(
         dpad_callbacks=StickCallbacks(
             on_left=_direction_action(Action.LEFT),
             on_right=_direction_action(Action.RIGHT),
             on_up=_button_action(Action.ROTATE_CW),
             on_down=_direction_action(Action.DOWN),
         ),
+        # Edge-triggered by the controller's stick filter, so stick noise
+        # doesn't queue actions
+        left_stick_callbacks=StickCallbacks(
+            on_left=_direction_action(Action.LEFT),
+            on_right=_direction_action(Action.RIGHT),
+            on_up=_button_action(Action.ROTATE_CW),
+            on_down=_direction_action(Action.DOWN),
+        ),
         button_callbacks=ButtonCallbacks(
             on_a=_button_action(Action.ROTATE_CW),
             on_b=_button_action(Action.ROTATE_CCW),
@@ -142,50 +236,213 @@ def _run_play(args):
             on_select=_select_callback,
         ),
     )
+    recorder = None
+    if not replaying and args.record:
+        recorder = EventRecorder(
+            args.record, {"seed": seed, "width": width, "height": height}
+        )
 
-    controller_thread = threading.Thread(target=controller.listen, daemon=True)
-    controller_thread.start()
+    def _factory(path: str, slot: int) -> Controller:
+        # Every connected pad drives the game; only the first is recorded
+        return Controller(
+            device=path, recorder=recorder if slot == 0 else None, **callbacks
+        )
+
+    if replaying:
+        source = ReplayController(args.recording, **callbacks)  # paced by _replay()
+    elif args.device:
+        source = Controller(device=args.device, recorder=recorder, **callbacks)
+    else:
+        # No fixed device: follow pads as they connect and reconnect
+        source = DeviceManager(_factory)
+
+    def _controller_state() -> ControllerState:
+        if not isinstance(source, DeviceManager):
+            return source.state
+        states = [controller.state for controller in source.controllers.values()]
+        return max(states, key=lambda state: state.received, default=EMPTY_STATE)
+
+    def _listen():
+        if isinstance(source, DeviceManager):
+            source.run()
+        else:
+            source.listen()
+
+    def _replay():
+        """Feed the recording frame by frame on the game clock of its events.
+
+        Gravity and DAS run at their exact deadlines in recording time up to
+        each frame, then the frame's inputs are applied, so the outcome
+        doesn't depend on the wall clock. Real-time playback only decides
+        when frames are fed and drawn.
+        """
+        frames = source.frames()
+        if not frames:
+            return
+        speed = None if args.max_speed else args.speed
+        # Game time is seconds since the first frame, which keeps the
+        # deadline arithmetic exact enough to land on every repeat
+        origin = frames[0][-1].time
+        started = last_render = time.monotonic()
+        drawn_version = game.version
+        next_gravity = game.gravity_interval
+        next_repeat = float("inf")
+
+        def advance(to: float):
+            """Run gravity and auto-repeat due up to game time ``to``."""
+            nonlocal next_gravity, next_repeat
+            while running:
+                now = min(next_gravity, next_repeat)
+                if now > to:
+                    return
+                due, next_repeat = _das(source.state, now, -origin)
+                for act in due:
+                    _apply(act)
+                if now >= next_gravity:
+                    game.tick()
+                    next_gravity = now + game.gravity_interval
 
-    RENDER_INTERVAL = 0.016  # ~60 FPS render loop
+        def render(force: bool = False):
+            nonlocal drawn_version, last_render
+            wall = time.monotonic()
+            if game.version == drawn_version:
+                return
+            if not force and wall - last_render < RENDER_INTERVAL:
+                return
+            if metrics is not None:
+                start = time.perf_counter()
+                renderer.draw(game)
+                metrics.record("draw", time.perf_counter() - start)
+                metrics.tick()
+            else:
+                renderer.draw(game)
+            drawn_version = game.version
+            last_render = wall
+
+        for frame in frames:
+            stamp = frame[-1].time - origin
+            while speed and running:
+                # Keep the game moving on screen until the frame is due
+                now = (time.monotonic() - started) * speed
+                if now >= stamp:
+                    break
+                advance(now)
+                render()
+                wake = min(stamp, next_gravity, next_repeat)
+                delay = wake / speed + started - time.monotonic()
+                if game.version != drawn_version:
+                    delay = min(delay, last_render + RENDER_INTERVAL - time.monotonic())
+                time.sleep(max(0.0, delay))
+            advance(stamp)
+            if not running:
+                break
+            source.feed(frame)
+            while running and not action_queue.empty():
+                _apply(action_queue.get_nowait())
+            due, next_repeat = _das(source.state, stamp, -origin)
+            for act in due:
+                _apply(act)
+            render()
+        render(force=True)
+
+    if replaying:
+        try:
+            renderer.draw(game)
+            _replay()
+        finally:
+            if metrics is not None:
+                metrics.close()
+            renderer.cleanup()
+        return
+
+    controller_thread = threading.Thread(target=_listen, daemon=True)
+    controller_thread.start()
 
     try:
-        last_gravity = time.monotonic()
+        renderer.draw(game)
+        drawn_version = game.version
+        last_render = time.monotonic()
+        next_gravity = last_render + game.gravity_interval
+        next_repeat = float("inf")
+        # Input latency: device clock -> monotonic offset (the smallest seen,
+        # i.e. the quickest delivery) and the earliest input not yet drawn
+        clock_offset = float("inf")
+        input_at: Optional[float] = None
         while running:
-            # Generate auto-repeat for held directions
-            _process_das()
+            # Sleep until an input arrives or the next deadline is due
+            deadline = min(next_gravity, next_repeat)
+            if game.version != drawn_version:
+                deadline = min(deadline, last_render + RENDER_INTERVAL)
+            timeout = deadline - time.monotonic()
+            try:
+                item = action_queue.get(timeout=max(0.0, timeout))
+            except queue.Empty:
+                item = None
+
+            # Apply every input that is due in this frame
+            if metrics is not None:
+                start = time.perf_counter()
+                if item is not None and input_at is None:
+                    state = _controller_state()
+                    clock_offset = min(clock_offset, state.received - state.time)
+                    input_at = state.time + clock_offset
+            while item is not None and running:
+                _apply(item)
+                try:
+                    item = action_queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            if metrics is not None:
+                metrics.record("input", time.perf_counter() - start)
+                start = time.perf_counter()
 
-            # Process one queued action per frame (renders each move visibly)
-            changed = _process_one_action()
+            # Generate auto-repeat for held directions
+            now = time.monotonic()
+            due, next_repeat = _das(_controller_state(), now)
+            for act in due:
+                _apply(act)
 
             # Apply gravity on schedule
-            now = time.monotonic()
-            if now - last_gravity >= game.gravity_interval:
-                with lock:
-                    if not game.game_over:
-                        old_piece = game.current_piece
-                        game.tick()
-                        changed = True
-                        if game.current_piece is not old_piece:
-                            _flush_queue()
-                last_gravity = now
-
-            # Render when something changed
-            if changed:
-                with lock:
+            if now >= next_gravity:
+                game.tick()
+                next_gravity = now + game.gravity_interval
+            if metrics is not None:
+                metrics.record("update", time.perf_counter() - start)
+
+            # Render when something changed, once per frame interval
+            if game.version != drawn_version and now - last_render >= RENDER_INTERVAL:
+                if metrics is not None:
+                    start = time.perf_counter()
                     renderer.draw(game)
-
-            # Short sleep to stay responsive without busy-spinning
-            time.sleep(RENDER_INTERVAL)
+                    metrics.record("draw", time.perf_counter() - start)
+                    if input_at is not None:
+                        metrics.record("latency", time.monotonic() - input_at)
+                        input_at = None
+                else:
+                    renderer.draw(game)
+                drawn_version = game.version
+                last_render = now
+            if metrics is not None:
+                metrics.tick()
     finally:
-        controller.stop()
+        if metrics is not None:
+            metrics.close()
+        source.stop()
+        controller_thread.join(timeout=1.0)  # let a recording close cleanly
         renderer.cleanup()
 
 
 def _run_demo(args):
     """Demo mode: AI plays Tetris automatically in a loop."""
-    from tetris_led.demo_ai import compute_best_actions
+    from tetris_led.demo_ai import load_weights
+    from tetris_led.planner import BackgroundPlanner
 
+    weights = load_weights(args.weights) if args.weights else None
     renderer = _make_renderer(args)
+    metrics = renderer.metrics = _make_metrics(args)
+    # Plans the next piece on a worker thread while the current one animates
+    planner = BackgroundPlanner(backend=args.backend, weights=weights)
+    planner.start()
     running = True
 
     def _on_signal(sig, frame):
@@ -195,35 +452,84 @@ def _run_demo(args):
     signal.signal(signal.SIGINT, _on_signal)
     signal.signal(signal.SIGTERM, _on_signal)
 
+    drawn = (None, -1)  # (game, version) last drawn
+
+    def _draw(game: TetrisGame):
+        nonlocal drawn
+        # Moves that didn't take (e.g. a blocked rotation) leave nothing to draw
+        if drawn == (game, game.version):
+            return
+        drawn = (game, game.version)
+        if metrics is None:
+            renderer.draw(game)
+            return
+        start = time.perf_counter()
+        renderer.draw(game)
+        metrics.record("draw", time.perf_counter() - start)
+        metrics.tick()
+
     try:
         while running:
             game = TetrisGame(width=args.width, height=args.height)
 
             while running and not game.game_over:
-                actions = compute_best_actions(game)
+                if metrics is not None:
+                    start = time.perf_counter()
+                    actions = planner.next_actions(game)
+                    metrics.record("ai", time.perf_counter() - start)
+                else:
+                    actions = planner.next_actions(game)
 
                 for act in actions:
                     if not running:
                         break
-                    game.action(act)
-                    renderer.draw(game)
+                    if metrics is not None:
+                        start = time.perf_counter()
+                        game.action(act)
+                        metrics.record("update", time.perf_counter() - start)
+                    else:
+                        game.action(act)
+                    _draw(game)
                     time.sleep(0.12)  # animate each move step
 
                 # If no hard drop in actions, tick gravity
                 if actions and actions[-1] != Action.DROP:
                     game.tick()
-                    renderer.draw(game)
+                    _draw(game)
 
                 time.sleep(0.4)  # pause between pieces for visual appeal
 
             # Game over — brief pause, then restart
             if running:
-                renderer.draw(game)
+                _draw(game)
                 time.sleep(3.0)
     finally:
+        if metrics is not None:
+            metrics.close()
+        planner.stop()
         renderer.cleanup()
 
 
+def _add_stats_args(parser):
+    """Add the opt-in metrics options to a subparser."""
+    parser.add_argument(
+        "--stats", action="store_true",
+        help="Collect frame timings and show them under the board (terminal renderer)",
+    )
+    parser.add_argument(
+        "--stats-output", default="",
+        help="Append timing summaries as JSON lines to a file or unix:/path socket",
+    )
+
+
+def _add_backend_arg(parser):
+    """Add the demo AI scoring backend option to a subparser."""
+    parser.add_argument(
+        "--backend", choices=("python", "numpy"), default="python",  # demo_ai.BACKENDS
+        help="AI scoring backend; numpy needs the [numpy] extra (default: python)",
+    )
+
+
 def _add_led_args(parser):
     """Add LED matrix hardware options to a subparser."""
     led = parser.add_argument_group("LED matrix options")
@@ -249,15 +555,42 @@ def main():
     # Play sub-command
     play_parser = subparsers.add_parser("play", help="Play with a Bluetooth controller")
     play_parser.add_argument(
-        "--device", default="", help="Input device path (auto-detected if not set)"
+        "--device", default="",
+        help="Input device path (default: any controller, reconnecting automatically)",
     )
     play_parser.add_argument(
         "--terminal", action="store_true", help="Use terminal renderer"
     )
     play_parser.add_argument("--width", type=int, default=10)
     play_parser.add_argument("--height", type=int, default=20)
+    play_parser.add_argument(
+        "--seed", type=int, default=None, help="Piece sequence seed (default: random)"
+    )
+    play_parser.add_argument(
+        "--record", default="", help="Record controller events and the seed to a file"
+    )
+    _add_stats_args(play_parser)
     _add_led_args(play_parser)
 
+    # Replay sub-command (play mode fed from a recording)
+    replay_parser = subparsers.add_parser(
+        "replay", help="Replay a session recorded with 'play --record'"
+    )
+    replay_parser.add_argument("recording", help="Recording file")
+    replay_parser.add_argument(
+        "--speed", type=float, default=1.0, help="Playback speed factor (default: 1.0)"
+    )
+    replay_parser.add_argument(
+        "--max-speed", action="store_true", help="Feed events as fast as possible"
+    )
+    replay_parser.add_argument(
+        "--terminal", action="store_true", help="Use terminal renderer"
+    )
+    replay_parser.add_argument("--width", type=int, default=10)
+    replay_parser.add_argument("--height", type=int, default=20)
+    _add_stats_args(replay_parser)
+    _add_led_args(replay_parser)
+
     # Demo sub-command
     demo_parser = subparsers.add_parser("demo", help="Auto-play demo (screensaver)")
     demo_parser.add_argument(
@@ -265,14 +598,79 @@ def main():
     )
     demo_parser.add_argument("--width", type=int, default=10)
     demo_parser.add_argument("--height", type=int, default=20)
+    demo_parser.add_argument(
+        "--weights", default="", help="AI weights file written by 'tetris-led tune'"
+    )
+    _add_backend_arg(demo_parser)
+    _add_stats_args(demo_parser)
     _add_led_args(demo_parser)
 
+    # Bench sub-command (headless, no renderer)
+    bench_parser = subparsers.add_parser(
+        "bench", aliases=["simulate"],
+        help="Play seeded demo games headless and report performance as JSON",
+    )
+    bench_parser.add_argument("--games", type=int, default=10, help="Games to play (default: 10)")
+    bench_parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the first game (default: 0)"
+    )
+    bench_parser.add_argument(
+        "--max-pieces", type=int, default=500, help="Piece limit per game (default: 500)"
+    )
+    bench_parser.add_argument("--depth", type=int, default=2, help="AI search depth (default: 2)")
+    bench_parser.add_argument(
+        "--beam-width", type=int, default=8, help="AI beam width (default: 8)"
+    )
+    bench_parser.add_argument("--output", default="", help="Write the JSON report to a file")
+    bench_parser.add_argument(
+        "--weights", default="", help="AI weights file written by 'tetris-led tune'"
+    )
+    _add_backend_arg(bench_parser)
+    bench_parser.add_argument("--width", type=int, default=10)
+    bench_parser.add_argument("--height", type=int, default=20)
+
+    # Tune sub-command (multi-process weight search)
+    tune_parser = subparsers.add_parser(
+        "tune", help="Search demo AI weights with seeded headless games"
+    )
+    tune_parser.add_argument(
+        "--generations", type=int, default=10, help="Optimizer generations (default: 10)"
+    )
+    tune_parser.add_argument(
+        "--population", type=int, default=16, help="Weight vectors per generation (default: 16)"
+    )
+    tune_parser.add_argument(
+        "--elite", type=int, default=4, help="Best vectors kept per generation (default: 4)"
+    )
+    tune_parser.add_argument(
+        "--games", type=int, default=4, help="Seeded games per weight vector (default: 4)"
+    )
+    tune_parser.add_argument("--seed", type=int, default=0, help="Tuning seed (default: 0)")
+    tune_parser.add_argument(
+        "--max-pieces", type=int, default=300, help="Piece limit per game (default: 300)"
+    )
+    tune_parser.add_argument("--depth", type=int, default=1, help="AI search depth (default: 1)")
+    tune_parser.add_argument(
+        "--workers", type=int, default=0, help="Worker processes (default: all cores)"
+    )
+    tune_parser.add_argument(
+        "--output", default="weights.json", help="Weights file to write (default: weights.json)"
+    )
+    tune_parser.add_argument("--width", type=int, default=10)
+    tune_parser.add_argument("--height", type=int, default=20)
+
     args = parser.parse_args()
 
-    if args.mode == "play":
+    if args.mode in ("play", "replay"):
         _run_play(args)
     elif args.mode == "demo":
         _run_demo(args)
+    elif args.mode in ("bench", "simulate"):
+        from tetris_led.bench import run
+        run(args)
+    elif args.mode == "tune":
+        from tetris_led.tune import run
+        run(args)
 
 
 if __name__ == "__main__":
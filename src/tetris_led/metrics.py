@@ -0,0 +1,144 @@
+"""Opt-in frame timing and input latency metrics.
+
+Play and demo mode pass a Metrics instance around only when --stats or
+--stats-output is given; everywhere else it is None, and the hot paths
+only pay for an ``is not None`` check.
+
+Samples go into fixed-size ring buffers, so memory stays flat over long
+sessions. The summaries give p50/p95/p99 in milliseconds. They can be
+drawn as an overlay by the terminal renderer, or written periodically as
+JSON lines to a file or a UNIX socket (``unix:/path``).
+"""
+
+import json
+import socket
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+# Recorded series, in the order the overlay shows them
+SERIES = ("input", "update", "draw", "swap", "latency", "ai")
+
+
+def percentiles(values: Sequence[float], points=(50, 90, 95, 99)) -> dict:
+    """Nearest-rank percentiles, keyed "p50", "p90", ... plus "max"."""
+    if not values:
+        return {f"p{p}": 0.0 for p in points} | {"max": 0.0}
+    ordered = sorted(values)
+    result = {}
+    for p in points:
+        rank = max(1, -(-p * len(ordered) // 100))
+        result[f"p{p}"] = ordered[rank - 1]
+    result["max"] = ordered[-1]
+    return result
+
+
+class RingBuffer:
+    """The last ``size`` float samples."""
+
+    def __init__(self, size: int = 1024):
+        self._data = array("d", bytes(8 * size))
+        self._size = size
+        self._next = 0
+        self.count = 0  # samples ever recorded
+
+    def append(self, value: float):
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self._size
+        self.count += 1
+
+    def values(self) -> List[float]:
+        if self.count < self._size:
+            return self._data[:self.count].tolist()
+        return self._data.tolist()
+
+
+class Metrics:
+    """Ring-buffered timings for the frame loop, AI and input latency.
+
+    ``record`` takes seconds. ``output`` is a file path or ``unix:/path``
+    for JSON lines, written at most every ``interval`` seconds from
+    ``tick``.
+    """
+
+    def __init__(
+        self, size: int = 1024, output: str = "", interval: float = 1.0
+    ):
+        self._series: Dict[str, RingBuffer] = {name: RingBuffer(size) for name in SERIES}
+        self.output = output
+        self.interval = interval
+        self._sink = None
+        self._next_emit = time.monotonic() + interval
+        self._summary: Optional[dict] = None
+        self._summary_at = 0.0
+
+    def record(self, name: str, seconds: float):
+        self._series[name].append(seconds)
+
+    def summary(self, max_age: float = 0.0) -> dict:
+        """{series: {"count", "p50", "p95", "p99"}} in milliseconds.
+
+        A summary younger than ``max_age`` seconds is reused, so an overlay
+        drawn every frame doesn't sort the buffers every frame.
+        """
+        now = time.monotonic()
+        if self._summary is not None and now - self._summary_at < max_age:
+            return self._summary
+        summary = {}
+        for name, series in self._series.items():
+            stats = percentiles(series.values(), (50, 95, 99))
+            summary[name] = {"count": series.count} | {
+                key: value * 1000.0 for key, value in stats.items() if key != "max"
+            }
+        self._summary, self._summary_at = summary, now
+        return summary
+
+    def overlay(self) -> List[str]:
+        """Text lines for a stats overlay."""
+        lines = []
+        for name, stats in self.summary(max_age=0.5).items():
+            if stats["count"]:
+                lines.append(
+                    f"{name:>7} p50 {stats['p50']:6.2f}  p95 {stats['p95']:6.2f}"
+                    f"  p99 {stats['p99']:6.2f} ms"
+                )
+        return lines
+
+    def tick(self):
+        """Write a JSON line if an output is set and the interval has passed."""
+        if not self.output:
+            return
+        now = time.monotonic()
+        if now < self._next_emit:
+            return
+        self._next_emit = now + self.interval
+        line = json.dumps({"time": time.time()} | self.summary(), sort_keys=True) + "\n"
+        try:
+            self._write(line.encode())
+        except OSError:
+            self._close_sink()  # listener went away; reconnect next time
+
+    def _write(self, data: bytes):
+        if self._sink is None:
+            if self.output.startswith("unix:"):
+                sink = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    sink.connect(self.output[len("unix:"):])
+                except OSError:
+                    sink.close()
+                    raise
+                self._sink = sink
+            else:
+                self._sink = open(self.output, "ab", buffering=0)
+        if isinstance(self._sink, socket.socket):
+            self._sink.sendall(data)
+        else:
+            self._sink.write(data)
+
+    def _close_sink(self):
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def close(self):
+        self._close_sink()
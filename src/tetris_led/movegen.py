@@ -0,0 +1,122 @@
+"""Reachable lock positions of a piece, found by breadth-first search.
+
+The search walks (rotation, row, col) states of the piece using the game's
+own rules: LEFT/RIGHT/DOWN steps checked with the same collision test as
+TetrisGame._try_move, and rotations with the same wall kicks as
+TetrisGame._try_rotate. Every path it returns therefore plays back exactly
+on a live game, including soft-drop tucks under overhangs and kicked spins
+that a straight drop from the spawn column can't reach.
+
+Rows above the stack are collapsed: while all four rows of the piece's
+box (plus room for a kick) are empty, only the walls matter, so shifts and
+rotations behave the same at every height. A soft drop from such a state
+jumps straight down to the first row near the stack instead of visiting
+each row on the way, which keeps the search proportional to the width and
+the stack depth rather than the board height. Visited states are one int
+bitset per rotation, indexed by row and column, and states are settled in
+order of path length so every path returned is a shortest one.
+"""
+
+import heapq
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from tetris_led.game import Action, Piece, _fits_rows, _land_rows, _rotate_rows
+
+# Rows above the start row the search may climb through kicks
+_HEADROOM = 4
+# Piece columns can start left of the wall (cells sit up to 3 columns right)
+_COL_PAD = 3
+# A state is in open air when this many rows from its top are all empty:
+# the 4-row piece box plus the deepest kick
+_OPEN_AIR = 6
+
+_STEPS = ((Action.LEFT, 0, -1), (Action.RIGHT, 0, 1))
+_ROTATIONS = ((Action.ROTATE_CW, 1), (Action.ROTATE_CCW, -1))
+
+
+class Move(NamedTuple):
+    """A lock position and the shortest action path to it (ending in DROP)."""
+
+    landed: Piece
+    actions: Tuple[Action, ...]
+
+
+def reachable_placements(
+    rows: Sequence[int],
+    width: int,
+    height: int,
+    piece: Piece,
+    max_states: Optional[int] = None,
+) -> List[Move]:
+    """Every lock position reachable from ``piece``, shortest paths first.
+
+    Placements landing on the same cells (symmetric rotations) are only
+    listed once. ``max_states`` caps the states settled; the placements
+    found so far are returned when it is reached.
+    """
+    if not _fits_rows(rows, width, height, piece):
+        return []
+    surface = next((r for r, mask in enumerate(rows) if mask), height)
+    stride = width + _COL_PAD
+    top = piece.row - _HEADROOM
+    visited = [0, 0, 0, 0]
+    parents = {piece: None}  # state -> (previous state, actions from it, distance)
+    heap = [(0, 0, piece)]
+    pushed = 1  # tie-breaker: FIFO among equal distances
+    settled = 0
+    moves: List[Move] = []
+    seen = set()
+
+    while heap:
+        dist, _, state = heapq.heappop(heap)
+        bit = 1 << ((state.row - top) * stride + state.col + _COL_PAD)
+        if visited[state.rotation] & bit:
+            continue
+        visited[state.rotation] |= bit
+        landed = _land_rows(rows, height, state)
+        cells = frozenset(landed.cells)
+        if cells not in seen:
+            seen.add(cells)
+            moves.append(Move(landed, _path(parents, state)))
+        settled += 1
+        if max_states is not None and settled >= max_states:
+            break
+
+        neighbours = []
+        for act, drow, dcol in _STEPS:
+            moved = state.moved(drow, dcol)
+            if _fits_rows(rows, width, height, moved):
+                neighbours.append(((act,), moved))
+        for act, direction in _ROTATIONS:
+            rotated = _rotate_rows(rows, width, height, state, direction)
+            if rotated is not None and rotated.row >= top:
+                neighbours.append(((act,), rotated))
+        if state.row + _OPEN_AIR <= surface:
+            drop = surface - _OPEN_AIR + 1 - state.row
+            neighbours.append(((Action.DOWN,) * drop, state.moved(drop, 0)))
+        else:
+            moved = state.moved(1, 0)
+            if _fits_rows(rows, width, height, moved):
+                neighbours.append(((Action.DOWN,), moved))
+
+        for actions, nxt in neighbours:
+            index = (nxt.row - top) * stride + nxt.col + _COL_PAD
+            if visited[nxt.rotation] >> index & 1:
+                continue
+            known = parents.get(nxt)
+            if known is not None and known[2] <= dist + len(actions):
+                continue
+            parents[nxt] = (state, actions, dist + len(actions))
+            heapq.heappush(heap, (dist + len(actions), pushed, nxt))
+            pushed += 1
+    return moves
+
+
+def _path(parents: dict, state: Piece) -> Tuple[Action, ...]:
+    steps = [(Action.DROP,)]
+    link = parents[state]
+    while link is not None:
+        state, actions, _ = link
+        steps.append(actions)
+        link = parents[state]
+    return tuple(act for actions in reversed(steps) for act in actions)
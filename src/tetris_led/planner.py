@@ -0,0 +1,201 @@
+"""Background planner for demo mode.
+
+While the current piece is still animating, a worker thread plans the next
+piece on a predicted snapshot of the board: the current placement is locked
+into the row bitmasks and the next piece is spawned from the preview. When
+the real game reaches that state the plan is handed over through a queue;
+when it does not (e.g. a rotation kicked, or the bag was refilled), the
+stale job is cancelled and the placement is computed inline instead.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+from tetris_led.demo_ai import (
+    DEFAULT_BEAM_WIDTH,
+    DEFAULT_DEPTH,
+    DEFAULT_TIME_BUDGET,
+    Placement,
+    Weights,
+    _placement_actions,
+    _surface,
+    _upcoming,
+    plan_placement,
+)
+from tetris_led.game import Action, Piece, TetrisGame
+
+
+class PlannerStats(NamedTuple):
+    requests: int
+    hits: int
+    misses: int
+    hit_rate: float
+    mean_latency: float   # seconds the caller waited for a placement
+    max_latency: float
+    mean_search: float    # seconds spent searching, inline or on the worker
+
+
+class _Job:
+    """One placement request for the worker thread."""
+
+    def __init__(self, key: tuple, rows, width: int, height: int, piece: Piece, upcoming, bag):
+        self.key = key
+        self.rows = rows
+        self.width = width
+        self.height = height
+        self.piece = piece
+        self.upcoming = upcoming
+        self.bag = bag
+        self.cancel = threading.Event()
+        self.done = threading.Event()
+        self.placement: Optional[Placement] = None
+        self.error: Optional[BaseException] = None
+
+
+def _state_key(rows, piece: Piece, next_name: str, bag) -> tuple:
+    return (tuple(rows), piece.name, piece.row, piece.col, piece.rotation,
+            next_name, tuple(sorted(bag)))
+
+
+class BackgroundPlanner:
+    """Plans each piece one step ahead on a worker thread."""
+
+    def __init__(
+        self,
+        depth: int = DEFAULT_DEPTH,
+        beam_width: Optional[int] = DEFAULT_BEAM_WIDTH,
+        time_budget: Optional[float] = DEFAULT_TIME_BUDGET,
+        backend: Optional[str] = None,
+        weights: Optional[Weights] = None,
+        history: int = 256,
+    ):
+        self.depth = depth
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+        self.backend = backend
+        self.weights = weights
+        self._jobs: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._pending: Optional[_Job] = None
+        self._thread: Optional[threading.Thread] = None
+        self._hits = 0
+        self._misses = 0
+        self._latencies: deque = deque(maxlen=history)
+        self._search_times: deque = deque(maxlen=history)
+
+    # --- Lifecycle ---
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._pending is not None:
+            self._pending.cancel.set()
+            self._pending = None
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            try:
+                if not job.cancel.is_set():
+                    job.placement = self._plan(
+                        job.rows, job.width, job.height, job.piece, job.upcoming, job.bag,
+                        cancel=job.cancel,
+                    )
+            except Exception as exc:  # keep the worker alive; the caller plans inline
+                job.error = exc
+            finally:
+                job.done.set()
+
+    def _plan(self, rows, width, height, piece, upcoming, bag, surface=None, cancel=None):
+        start = time.monotonic()
+        placement = plan_placement(
+            rows, width, height, piece,
+            upcoming=upcoming,
+            bag=bag,
+            backend=self.backend,
+            beam_width=self.beam_width,
+            time_budget=self.time_budget,
+            surface=surface,
+            cancel=cancel,
+            weights=self.weights,
+        )
+        if cancel is None or not cancel.is_set():
+            self._search_times.append(time.monotonic() - start)
+        return placement
+
+    # --- Planning ---
+
+    def next_actions(self, game: TetrisGame) -> list[Action]:
+        """Actions for the current piece, then start planning the next one."""
+        if game.current_piece is None or game.game_over:
+            return []
+
+        start = time.monotonic()
+        rows = game.row_masks
+        key = _state_key(rows, game.current_piece, game.next_piece_name, game.bag)
+        job, self._pending = self._pending, None
+        hit = job is not None and job.key == key
+        if hit:
+            job.done.wait()
+            hit = job.error is None  # a search that failed on the worker is redone here
+        if hit:
+            placement = job.placement
+            self._hits += 1
+        else:
+            if job is not None:
+                job.cancel.set()
+            self._misses += 1
+            placement = self._plan(
+                rows, game.width, game.height, game.current_piece,
+                _upcoming(game.next_piece_name, self.depth),
+                game.bag,
+                surface=_surface(game),
+            )
+        self._latencies.append(time.monotonic() - start)
+
+        if self._thread is not None:
+            self._prefetch(game, placement)
+        return _placement_actions(placement)
+
+    def _prefetch(self, game: TetrisGame, placement: Optional[Placement]):
+        """Queue a job for the state the game reaches after ``placement``."""
+        # The piece after next is only predictable while the bag has pieces left
+        if placement is None or not game.bag:
+            return
+        after = game.apply_placement(game.snapshot(), placement.landed)
+        if after.game_over:
+            return
+        key = _state_key(after.rows, after.piece, after.next_piece_name, after.bag)
+        self._pending = _Job(
+            key, after.rows, game.width, game.height, after.piece,
+            _upcoming(after.next_piece_name, self.depth), after.bag,
+        )
+        self._jobs.put(self._pending)
+
+    # --- Stats ---
+
+    @property
+    def stats(self) -> PlannerStats:
+        requests = self._hits + self._misses
+        latencies = list(self._latencies)
+        searches = list(self._search_times)
+        return PlannerStats(
+            requests=requests,
+            hits=self._hits,
+            misses=self._misses,
+            hit_rate=self._hits / requests if requests else 0.0,
+            mean_latency=sum(latencies) / len(latencies) if latencies else 0.0,
+            max_latency=max(latencies, default=0.0),
+            mean_search=sum(searches) / len(searches) if searches else 0.0,
+        )
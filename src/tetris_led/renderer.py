@@ -3,15 +3,81 @@
 Provides a base class and two concrete renderers:
 - LedMatrixRenderer: drives the Raspberry Pi RGB LED matrix
 - TerminalRenderer: ANSI terminal fallback for development/testing
+
+Both get their frames from a FrameComposer, which caches the parts of a
+frame that haven't changed since the last draw.
 """
 
+import sys
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from tetris_led.game import PIECE_COLORS, Cell, Piece, TetrisGame
+from tetris_led.metrics import Metrics
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+_BLACK = (0, 0, 0)
+
+
+class FrameComposer:
+    """Builds frames for the renderers, reusing work between draws.
 
-from tetris_led.game import TetrisGame
+    A frame is the row-major list of cell colors: locked cells, then the
+    ghost (dimmed), then the current piece. The locked cells are composed
+    once per ``board_generation`` (i.e. until the next lock), the ghost is
+    looked up once per piece position and board generation, and a draw at
+    an unchanged game ``version`` gets the previous frame back. Otherwise
+    only the ghost and the piece are overlaid on a copy of the background.
+    Returned frames are shared: treat them as read-only.
+    """
+
+    def __init__(self):
+        self._game: Optional[TetrisGame] = None
+        self._generation = -1
+        self._background: List[Cell] = []
+        self._ghost: Optional[Piece] = None
+        self._ghost_for: Optional[Piece] = None
+        self._version = -1
+        self._frame: Optional[List[Cell]] = None
+
+    def compose(self, game: TetrisGame) -> List[Cell]:
+        if game is self._game and game.version == self._version:
+            return self._frame
+        if game is not self._game or game.board_generation != self._generation:
+            self._background = [cell for row in game.board for cell in row]
+            self._game = game
+            self._generation = game.board_generation
+            self._ghost_for = None
+
+        piece = None if game.game_over else game.current_piece
+        frame = self._background.copy()
+        if piece is not None:
+            if piece is not self._ghost_for:
+                self._ghost = game.get_drop_ghost()
+                self._ghost_for = piece
+            w, h = game.width, game.height
+            gr, gg, gb = piece.color
+            dim = (gr // 6, gg // 6, gb // 6)
+            for r, c in self._ghost.cells:
+                if 0 <= r < h:
+                    frame[r * w + c] = dim
+            for r, c in piece.cells:
+                if 0 <= r < h:
+                    frame[r * w + c] = piece.color
+        self._version = game.version
+        self._frame = frame
+        return frame
 
 
 class Renderer(ABC):
+    # Set to collect "swap" timings (and, where supported, draw a stats overlay)
+    metrics: Optional[Metrics] = None
+
     @abstractmethod
     def draw(self, game: TetrisGame) -> None:
         """Render the current game state."""
@@ -22,7 +88,16 @@ class Renderer(ABC):
 
 
 class LedMatrixRenderer(Renderer):
-    """Renders onto an RGB LED matrix via rgbmatrix library."""
+    """Renders onto an RGB LED matrix via rgbmatrix library.
+
+    Frames are composed as a flat list of cell colors. The renderer
+    remembers what each of the two swap-chain canvases currently shows and
+    skips frames the canvas being drawn already holds. With Pillow
+    installed, a changed frame is packed into one RGB buffer from
+    precomputed cell tiles and pushed with a single SetImage call;
+    otherwise only the changed cells are repainted pixel by pixel. Full
+    repaints happen on the first frame, after a line clear and on restart.
+    """
 
     def __init__(
         self,
@@ -48,38 +123,87 @@ class LedMatrixRenderer(Renderer):
         self._canvas = self._matrix.CreateFrameCanvas()
         self._rows = rows
         self._cols = cols
+        # Cells shown by the offscreen canvas (drawn next) and the displayed one
+        self._back_frame: Optional[List[Cell]] = None
+        self._front_frame: Optional[List[Cell]] = None
+        self._cell_size = 0
+        self._game: Optional[TetrisGame] = None
+        self._lines_cleared = 0
+        # One pixel row of a cell, per color, for the current cell size
+        self._tiles: Dict[Cell, bytes] = {}
+        self._composer = FrameComposer()
 
     def draw(self, game: TetrisGame) -> None:
-        self._canvas.Clear()
+        frame = self._composer.compose(game)
 
         # Compute pixel size so the game board fits the matrix
         cell_w = self._cols // game.width
         cell_h = self._rows // game.height
         cell_size = max(1, min(cell_w, cell_h))
 
-        # Draw locked cells
-        for r in range(game.height):
-            for c in range(game.width):
-                color = game.board[r][c]
+        full = (
+            self._back_frame is None
+            or len(self._back_frame) != len(frame)
+            or cell_size != self._cell_size
+            or game is not self._game
+            or game.lines_cleared != self._lines_cleared
+        )
+        w = game.width
+        if Image is not None:
+            if cell_size != self._cell_size:
+                self._tiles = self._build_tiles(cell_size)
+            if full:
+                self._canvas.Clear()
+            if full or frame != self._back_frame:
+                self._canvas.SetImage(self._frame_image(frame, w, cell_size), 0, 0)
+        elif full:
+            self._canvas.Clear()
+            for i, color in enumerate(frame):
                 if color is not None:
-                    self._fill_cell(r, c, color, cell_size)
+                    self._fill_cell(i // w, i % w, color, cell_size)
+        else:
+            back = self._back_frame
+            for i, color in enumerate(frame):
+                if color != back[i]:
+                    self._fill_cell(i // w, i % w, color or _BLACK, cell_size)
 
-        # Draw ghost piece (dimmed)
-        ghost = game.get_drop_ghost()
-        if ghost is not None and not game.game_over:
-            gr, gg, gb = ghost.color
-            dim = (gr // 6, gg // 6, gb // 6)
-            for r, c in ghost.cells:
-                if r >= 0:
-                    self._fill_cell(r, c, dim, cell_size)
+        if self.metrics is not None:
+            start = time.perf_counter()
+            self._canvas = self._matrix.SwapOnVSync(self._canvas)
+            self.metrics.record("swap", time.perf_counter() - start)
+        else:
+            self._canvas = self._matrix.SwapOnVSync(self._canvas)
+        # The canvas we get back is the one that was on screen until now;
+        # its contents are unknown if it was drawn with another layout.
+        front = self._front_frame
+        if front is not None and (len(front) != len(frame) or cell_size != self._cell_size):
+            front = None
+        self._back_frame, self._front_frame = front, frame
+        self._cell_size = cell_size
+        self._game = game
+        self._lines_cleared = game.lines_cleared
 
-        # Draw current piece
-        if game.current_piece is not None and not game.game_over:
-            for r, c in game.current_piece.cells:
-                if r >= 0:
-                    self._fill_cell(r, c, game.current_piece.color, cell_size)
+    @staticmethod
+    def _build_tiles(cell_size: int) -> Dict[Cell, bytes]:
+        """Tile rows for the piece palette, its dimmed ghost colors and black."""
+        tiles: Dict[Cell, bytes] = {None: bytes(_BLACK) * cell_size}
+        for r, g, b in PIECE_COLORS.values():
+            tiles[(r, g, b)] = bytes((r, g, b)) * cell_size
+            tiles[(r // 6, g // 6, b // 6)] = bytes((r // 6, g // 6, b // 6)) * cell_size
+        return tiles
 
-        self._canvas = self._matrix.SwapOnVSync(self._canvas)
+    def _frame_image(self, frame: List[Cell], width: int, cell_size: int):
+        """Pack the frame into one RGB image, ``cell_size`` pixels per cell."""
+        tiles = self._tiles
+        lines = []
+        for start in range(0, len(frame), width):
+            line = b"".join([
+                tiles.get(color) or bytes(color) * cell_size
+                for color in frame[start:start + width]
+            ])
+            lines.append(line * cell_size)
+        size = (width * cell_size, len(frame) // width * cell_size)
+        return Image.frombuffer("RGB", size, b"".join(lines), "raw", "RGB", 0, 1)
 
     def _fill_cell(
         self, row: int, col: int, color: Tuple[int, int, int], cell_size: int
@@ -95,7 +219,13 @@ class LedMatrixRenderer(Renderer):
 
 
 class TerminalRenderer(Renderer):
-    """ANSI terminal renderer for development without LED hardware."""
+    """ANSI terminal renderer for development without LED hardware.
+
+    Remembers the previous frame and rewrites only the cells that changed,
+    using cursor moves, so a typical frame is a few dozen bytes rather than
+    the whole board. Each frame goes out in one write, and the cursor is
+    hidden until cleanup.
+    """
 
     _COLOR_MAP = {
         (0, 240, 240): "\033[96m",     # I - cyan
@@ -108,46 +238,94 @@ class TerminalRenderer(Renderer):
     }
     _RESET = "\033[0m"
 
+    # Screen rows (1-based): status, top border, board, bottom border,
+    # game-over line, then the stats overlay
+    _BOARD_TOP = 3
+
+    def __init__(self, out: Optional[TextIO] = None):
+        self._out = out or sys.stdout
+        self._cells: Dict[Cell, str] = {None: "  "}
+        self._frame: Optional[List[Cell]] = None
+        self._size: Optional[Tuple[int, int]] = None
+        self._status = ""
+        self._game_over = False
+        self._overlay = 0
+        self._composer = FrameComposer()
+
+    def _cell(self, color: Cell) -> str:
+        text = self._cells.get(color)
+        if text is None:
+            ansi = self._COLOR_MAP.get(color, "\033[37m")
+            text = self._cells[color] = f"{ansi}[]{self._RESET}"
+        return text
+
     def draw(self, game: TetrisGame) -> None:
-        # Build a display grid
-        grid = [
-            [game.board[r][c] for c in range(game.width)]
-            for r in range(game.height)
-        ]
-
-        # Overlay ghost
-        ghost = game.get_drop_ghost()
-        if ghost is not None and not game.game_over:
-            gr, gg, gb = ghost.color
-            dim = (gr // 6, gg // 6, gb // 6)
-            for r, c in ghost.cells:
-                if 0 <= r < game.height and grid[r][c] is None:
-                    grid[r][c] = dim
-
-        # Overlay current piece
-        if game.current_piece is not None and not game.game_over:
-            for r, c in game.current_piece.cells:
-                if 0 <= r < game.height:
-                    grid[r][c] = game.current_piece.color
-
-        lines = [f"\033[H\033[J"]  # clear screen
-        lines.append(f"Score: {game.score}  Level: {game.level}  Lines: {game.lines_cleared}")
-        lines.append("+" + "--" * game.width + "+")
-        for r in range(game.height):
-            row_str = "|"
-            for c in range(game.width):
-                color = grid[r][c]
-                if color is None:
-                    row_str += "  "
-                else:
-                    ansi = self._COLOR_MAP.get(color, "\033[37m")
-                    row_str += f"{ansi}[]{self._RESET}"
-            row_str += "|"
-            lines.append(row_str)
-        lines.append("+" + "--" * game.width + "+")
-        if game.game_over:
-            lines.append("        GAME OVER")
-        print("\n".join(lines))
+        frame = self._composer.compose(game)
+        w, h = game.width, game.height
+        top = self._BOARD_TOP
+        cell = self._cell
+        out = []
+
+        prev = self._frame
+        if prev is None or self._size != (w, h):
+            border = "+" + "--" * w + "+"
+            out.append(f"\033[?25l\033[H\033[J\033[2;1H{border}\033[{top + h};1H{border}")
+            for r in range(h):
+                row = "".join([cell(color) for color in frame[r * w:(r + 1) * w]])
+                out.append(f"\033[{top + r};1H|{row}|")
+            self._size = (w, h)
+            self._status = ""
+            self._game_over = False
+            self._overlay = 0
+        elif frame is not prev:
+            # Rewrite each run of changed cells after one cursor move
+            for r in range(h):
+                base = r * w
+                if frame[base:base + w] == prev[base:base + w]:
+                    continue
+                c = 0
+                while c < w:
+                    if frame[base + c] == prev[base + c]:
+                        c += 1
+                        continue
+                    start = c
+                    while c < w and frame[base + c] != prev[base + c]:
+                        c += 1
+                    run = "".join([cell(color) for color in frame[base + start:base + c]])
+                    out.append(f"\033[{top + r};{2 + 2 * start}H{run}")
+        self._frame = frame
+
+        status = f"Score: {game.score}  Level: {game.level}  Lines: {game.lines_cleared}"
+        if status != self._status:
+            out.append(f"\033[1;1H{status}\033[K")
+            self._status = status
+        if game.game_over != self._game_over:
+            text = "        GAME OVER" if game.game_over else ""
+            out.append(f"\033[{top + h + 1};1H{text}\033[K")
+            self._game_over = game.game_over
+        if self.metrics is not None:
+            lines = self.metrics.overlay()
+            row = top + h + 2
+            for i, line in enumerate(lines):
+                out.append(f"\033[{row + i};1H{line}\033[K")
+            for i in range(len(lines), self._overlay):
+                out.append(f"\033[{row + i};1H\033[K")
+            self._overlay = len(lines)
+
+        if not out:
+            return
+        if self.metrics is not None:
+            start = time.perf_counter()
+            self._write("".join(out))
+            self.metrics.record("swap", time.perf_counter() - start)
+        else:
+            self._write("".join(out))
+
+    def _write(self, text: str):
+        self._out.write(text)
+        self._out.flush()
 
     def cleanup(self) -> None:
-        print(f"\033[0m\033[?25h")  # reset colors, show cursor
+        # Park the cursor below everything drawn, reset colors, show cursor
+        rows = (self._size[1] if self._size else 0) + self._BOARD_TOP + 2 + self._overlay
+        self._write(f"\033[{rows};1H\033[0m\033[?25h\n")
@@ -0,0 +1,58 @@
+from bt_8bitdo_30snpro.controller import (
+    AXIS_INDEX,
+    Controller,
+    InputEvent,
+    StickCallbacks,
+)
+
+FULL = 32767
+LEFT_X = AXIS_INDEX["left_x"]
+
+
+def _push(controller, samples, number=0):
+    """Feed joystick axis samples as (seconds, fraction of full scale),
+    the way events() does: state first, then callbacks."""
+    for stamp, fraction in samples:
+        events = [InputEvent(stamp, 2, number, int(fraction * FULL))]
+        for event in controller._ingest(events, False):
+            controller._parse_js_event(event.type, event.code, event.value)
+
+
+def test_stick_direction_ignores_jitter_around_deadzone():
+    presses = []
+    controller = Controller(
+        "/dev/input/js0",
+        left_stick_callbacks=StickCallbacks(on_right=lambda v: v and presses.append(v)),
+    )
+    _push(controller, [(1.0, 0.2), (1.1, 0.36)])
+    assert controller.state.direction("left_x") == 1
+    assert controller.state.moved_at[LEFT_X] == 1.1
+
+    # Noise either side of the deadzone stays above the release threshold
+    _push(controller, [(1.1 + i / 100, 0.33 if i % 2 else 0.37) for i in range(1, 21)])
+    state = controller.state
+    assert state.direction("left_x") == 1
+    assert state.moved_at[LEFT_X] == 1.1
+    assert len(presses) == 1
+
+    _push(controller, [(1.4, 0.2)])
+    assert controller.state.direction("left_x") == 0
+    assert controller.state.moved_at[LEFT_X] == 1.4
+
+
+def test_press_time_is_the_deadzone_crossing():
+    # The axis changed sign at 1.0, but the stick only crossed the deadzone at 1.5
+    controller = Controller("/dev/input/js0")
+    _push(controller, [(1.0, 0.05), (1.2, 0.2), (1.5, 0.4)])
+    assert controller.state.axes[LEFT_X] > 0
+    assert controller.state.direction("left_x") == 1
+    assert controller.state.moved_at[LEFT_X] == 1.5
+
+
+def test_dpad_and_unfiltered_sticks_use_the_sign():
+    controller = Controller("/dev/input/js0", stick_filter=None)
+    _push(controller, [(1.0, 0.05)])
+    assert controller.state.direction("left_x") == 1
+    _push(controller, [(2.0, -1.0)], number=4)  # d-pad x
+    assert controller.state.direction("dpad_x") == -1
+    assert controller.state.moved_at[AXIS_INDEX["dpad_x"]] == 2.0
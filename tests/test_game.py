@@ -0,0 +1,40 @@
+from tetris_led import game as game_module
+from tetris_led.game import Action, Piece, TetrisGame
+
+
+def test_restore_spawns_piece_left_undecided():
+    game = TetrisGame(seed=1)
+    while game.bag:
+        game.action(Action.DROP)
+    snapshot = game.snapshot()
+    for _ in range(2):
+        snapshot = game.apply_placement(snapshot, game._landing(snapshot.piece))
+    assert snapshot.piece is None and not snapshot.game_over
+
+    game.restore(snapshot)
+    assert game.current_piece is not None
+    assert game.next_piece_name is not None
+    assert game.action(Action.DROP)
+
+
+def test_apply_placement_matches_play():
+    game = TetrisGame(seed=2)
+    while not game.game_over:
+        predicted = game.apply_placement(game.snapshot(), game.get_drop_ghost())
+        game.action(Action.DROP)
+        actual = game.snapshot()
+        if predicted.next_piece_name is None:
+            predicted = predicted._replace(
+                next_piece_name=actual.next_piece_name, bag=actual.bag
+            )
+        assert predicted == actual
+
+
+def test_pieces_equal_across_cache_flush():
+    before = Piece("T", 3, 4, 1)
+    game_module._PIECE_CACHE.clear()
+    after = Piece("T", 3, 4, 1)
+    assert after is not before
+    assert after == before and hash(after) == hash(before)
+    assert {before: 1}[after] == 1
+    assert after != Piece("T", 3, 4, 2)
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+
+import pytest
+
+from bt_8bitdo_30snpro.controller import Controller
+from bt_8bitdo_30snpro.hotplug import DeviceManager
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class _FakeInput:
+    """A temp /dev/input of FIFOs with a matching /sys/class/input."""
+
+    def __init__(self, root):
+        self.input_dir = root / "input"
+        self.sysfs_dir = root / "sysfs"
+        self.input_dir.mkdir()
+        self.sysfs_dir.mkdir()
+        self._writers = {}
+
+    def plug(self, node, name="8BitDo SN30 Pro", same_device_as=None):
+        device = self.sysfs_dir / node / "device"
+        if same_device_as is None:
+            device.mkdir(parents=True, exist_ok=True)
+            (device / "name").write_text(name + "\n")
+        else:
+            device.parent.mkdir()
+            device.symlink_to(self.sysfs_dir / same_device_as / "device")
+        # Hold the write end open so the controller sees an idle device, not
+        # EOF, and only then move the node into place
+        staged = self.sysfs_dir / node / "fifo"
+        os.mkfifo(staged)
+        self._writers[node] = os.open(staged, os.O_RDWR | os.O_NONBLOCK)
+        os.rename(staged, self.input_dir / node)
+
+    def unplug(self, node):
+        os.unlink(self.input_dir / node)
+        os.close(self._writers.pop(node))
+
+    def close(self):
+        for fd in self._writers.values():
+            os.close(fd)
+
+
+@pytest.mark.parametrize("use_inotify", (True, False))
+def test_bind_unplug_and_rebind(tmp_path, use_inotify):
+    fake = _FakeInput(tmp_path)
+    connected, disconnected = [], []
+    manager = DeviceManager(
+        lambda path, slot: Controller(path),
+        input_dir=str(fake.input_dir),
+        sysfs_dir=str(fake.sysfs_dir),
+        poll_interval=0.01,
+        use_inotify=use_inotify,
+        on_connect=lambda slot, controller: connected.append((slot, controller.device)),
+        on_disconnect=lambda slot, controller: disconnected.append(slot),
+    )
+    thread = threading.Thread(target=manager.run, daemon=True)
+    thread.start()
+    js0, js1 = str(fake.input_dir / "js0"), str(fake.input_dir / "js1")
+    try:
+        fake.plug("js0")
+        _wait_for(lambda: 0 in manager.controllers)
+        assert manager.controller(0).device == js0
+
+        fake.plug("js1")
+        _wait_for(lambda: 1 in manager.controllers)
+
+        fake.unplug("js0")
+        _wait_for(lambda: disconnected)
+        assert disconnected == [0]
+        assert list(manager.controllers) == [1]
+
+        # The reconnected pad gets the lowest free slot back
+        fake.plug("js0")
+        _wait_for(lambda: len(connected) == 3)
+        assert connected == [(0, js0), (1, js1), (0, js0)]
+        assert sorted(manager.controllers) == [0, 1]
+    finally:
+        manager.stop()
+        thread.join(timeout=5)
+        fake.close()
+    assert not thread.is_alive()
+    assert manager.controllers == {}
+
+
+def test_scan_picks_one_node_per_controller(tmp_path):
+    fake = _FakeInput(tmp_path)
+    manager = DeviceManager(
+        lambda path, slot: Controller(path),
+        input_dir=str(fake.input_dir),
+        sysfs_dir=str(fake.sysfs_dir),
+    )
+    try:
+        fake.plug("js0", name="Some Keyboard")
+        fake.plug("js1")
+        fake.plug("event3", same_device_as="js1")  # the pad's evdev node
+        fake.plug("event4")
+        assert manager.scan() == [str(fake.input_dir / "event4"), str(fake.input_dir / "js1")]
+    finally:
+        fake.close()
@@ -0,0 +1,49 @@
+import threading
+
+from tetris_led.game import TetrisGame
+from tetris_led.planner import BackgroundPlanner
+
+
+def _play(game, actions):
+    for act in actions:
+        game.action(act)
+
+
+def test_failed_worker_search_falls_back_to_inline():
+    game = TetrisGame(seed=4)
+    planner = BackgroundPlanner(depth=1, time_budget=None)
+    plan = planner._plan
+
+    def flaky(*args, cancel=None, **kwargs):
+        if cancel is not None:  # only the worker passes a cancel event
+            raise RuntimeError("search failed")
+        return plan(*args, cancel=cancel, **kwargs)
+
+    planner._plan = flaky
+    planner.start()
+    try:
+        _play(game, planner.next_actions(game))
+        result = []
+        caller = threading.Thread(
+            target=lambda: result.append(planner.next_actions(game)), daemon=True
+        )
+        caller.start()
+        caller.join(timeout=10)
+        assert not caller.is_alive(), "next_actions blocked on the failed job"
+        assert result[0]
+        assert planner._thread.is_alive()
+        assert planner.stats.hits == 0 and planner.stats.misses == 2
+    finally:
+        planner.stop()
+
+
+def test_prefetched_plan_is_used():
+    game = TetrisGame(seed=4)
+    planner = BackgroundPlanner(depth=1, time_budget=None)
+    planner.start()
+    try:
+        _play(game, planner.next_actions(game))
+        planner.next_actions(game)
+        assert planner.stats.hits == 1
+    finally:
+        planner.stop()
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import struct
+
+import pytest
+
+from bt_8bitdo_30snpro.recording import (
+    _HEADER,
+    MAGIC,
+    VERSION,
+    EventRecorder,
+    ReplayController,
+    _portable_format,
+)
+
+
+def _write(path, meta, events):
+    blob = json.dumps(meta).encode()
+    data = b"".join(struct.pack(meta["format"], *event) for event in events)
+    path.write_bytes(_HEADER.pack(MAGIC, VERSION, len(blob)) + blob + data)
+
+
+def _replay(path):
+    controller = ReplayController(str(path), speed=None)
+
+    async def collect():
+        return [event async for event in controller.events(dispatch=False)]
+
+    return asyncio.run(collect())
+
+
+def test_native_formats_are_stored_with_explicit_sizes():
+    assert _portable_format("llHHi") in ("<qqHHi", "<iiHHi", ">qqHHi", ">iiHHi")
+    assert struct.calcsize(_portable_format("llHHi")) == struct.calcsize("llHHi")
+    assert _portable_format("<IhBB") == "<IhBB"
+
+
+def test_recorder_header_has_portable_format(tmp_path):
+    path = tmp_path / "session.rec"
+    recorder = EventRecorder(str(path), {"seed": 1})
+    recorder.start(True, "llHHi")
+    recorder.close()
+    meta = json.loads(path.read_bytes()[_HEADER.size:])
+    assert meta["format"] == _portable_format("llHHi")
+    assert meta["size"] == struct.calcsize("llHHi")
+
+
+@pytest.mark.parametrize("fmt", ("<iiHHi", "<qqHHi"))
+def test_replays_recordings_from_either_word_size(tmp_path, fmt):
+    # 32- and 64-bit evdev structs both decode, whatever this machine uses
+    path = tmp_path / "session.rec"
+    events = [(10, 500000, 1, 304, 1), (10, 500000, 0, 0, 0)]
+    _write(path, {"evdev": True, "format": fmt, "size": struct.calcsize(fmt)}, events)
+    decoded = _replay(path)
+    assert [(e.type, e.code, e.value) for e in decoded] == [(1, 304, 1), (0, 0, 0)]
+    assert decoded[0].time == pytest.approx(10.5)
+
+
+def test_rejects_format_size_mismatch(tmp_path):
+    path = tmp_path / "session.rec"
+    _write(path, {"evdev": True, "format": "<iiHHi", "size": 24}, [])
+    with pytest.raises(ValueError):
+        ReplayController(str(path))
+
+
+def test_stop_before_replay_starts_is_honoured(tmp_path):
+    path = tmp_path / "session.rec"
+    events = [(10, 500000, 1, 304, 1), (10, 500000, 0, 0, 0)]
+    _write(path, {"evdev": True, "format": "<qqHHi", "size": 24}, events)
+    controller = ReplayController(str(path), speed=None)
+
+    async def collect():
+        return [event async for event in controller.events(dispatch=False)]
+
+    controller.stop()  # e.g. from another thread before listen() gets going
+    assert asyncio.run(collect()) == []
+    assert len(asyncio.run(collect())) == 2  # the stop was used up by that run
@@ -0,0 +1,40 @@
+import random
+
+from tetris_led.game import Action, TetrisGame
+from tetris_led.renderer import FrameComposer
+
+
+def compose_frame(game):
+    """Reference frame, composed from scratch."""
+    frame = [cell for row in game.board for cell in row]
+    if game.current_piece is None or game.game_over:
+        return frame
+    w, h = game.width, game.height
+    ghost = game.get_drop_ghost()
+    gr, gg, gb = ghost.color
+    for r, c in ghost.cells:
+        if 0 <= r < h:
+            frame[r * w + c] = (gr // 6, gg // 6, gb // 6)
+    for r, c in game.current_piece.cells:
+        if 0 <= r < h:
+            frame[r * w + c] = game.current_piece.color
+    return frame
+
+
+def test_composer_matches_reference():
+    rng = random.Random(0)
+    game = TetrisGame(seed=0)
+    composer = FrameComposer()
+    for step in range(3000):
+        if game.game_over:
+            game.reset(seed=step)
+        roll = rng.random()
+        if roll < 0.05:
+            game.tick()
+        elif roll < 0.07:
+            game.restore(game.snapshot())
+        elif roll < 0.5:
+            pass  # redraw an unchanged state
+        else:
+            game.action(rng.choice(list(Action)))
+        assert composer.compose(game) == compose_frame(game)
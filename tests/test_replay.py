@@ -0,0 +1,101 @@
+import json
+import random
+import struct
+from argparse import Namespace
+
+import pytest
+
+from bt_8bitdo_30snpro.recording import _HEADER, MAGIC, VERSION
+from tetris_led import main
+
+# Controls as (joystick (type, number), evdev (type, code))
+_CONTROLS = {
+    "a": ((1, 1), (1, 0x130)),
+    "b": ((1, 0), (1, 0x131)),
+    "y": ((1, 2), (1, 0x133)),
+    "select": ((1, 8), (1, 0x13A)),
+    "left_x": ((2, 0), (3, 0x00)),
+    "dpad_x": ((2, 4), (3, 0x10)),
+    "dpad_y": ((2, 5), (3, 0x11)),
+}
+
+
+def _session(seed):
+    """A few seconds of d-pad, stick and button input as (seconds, control,
+    value), ending with select."""
+    rng = random.Random(seed)
+    events, t = [], 1.0
+    for _ in range(60):
+        t += rng.uniform(0.02, 0.25)
+        if rng.random() < 0.4:
+            axis = rng.choice(("dpad_x", "dpad_y", "left_x"))
+            full = 32767 if axis == "left_x" else 1
+            value = full if axis == "dpad_y" else rng.choice((-full, full))
+            events.append((t, axis, value))
+            t += rng.uniform(0.03, 0.4)  # short taps and held auto-repeats
+            events.append((t, axis, 0))
+        else:
+            button = rng.choice(("a", "b", "y"))
+            events.append((t, button, 1))
+            t += rng.uniform(0.02, 0.08)
+            events.append((t, button, 0))
+    events.append((t + 0.5, "select", 1))
+    return events
+
+
+def _record(path, events, seed, evdev):
+    if evdev:
+        # Wall-clock kernel timestamps, each event in its own SYN_REPORT frame
+        fmt = "<qqHHi"
+        structs = []
+        for t, control, value in events:
+            sec, usec = divmod(round((1.7e9 + t) * 1e6), 1000000)
+            ev_type, code = _CONTROLS[control][1]
+            structs += [(sec, usec, ev_type, code, value), (sec, usec, 0, 0, 0)]
+    else:
+        fmt = "<IhBB"  # time (ms), value, type, number
+        structs = [
+            (round(t * 1000), value, *_CONTROLS[control][0]) for t, control, value in events
+        ]
+    meta = {
+        "evdev": evdev, "format": fmt, "size": struct.calcsize(fmt),
+        "seed": seed, "width": 10, "height": 20,
+    }
+    blob = json.dumps(meta).encode()
+    data = b"".join(struct.pack(fmt, *fields) for fields in structs)
+    path.write_bytes(_HEADER.pack(MAGIC, VERSION, len(blob)) + blob + data)
+
+
+class _Capture:
+    """Renderer stand-in that keeps the last game drawn."""
+
+    game = None
+
+    def draw(self, game):
+        self.game = game
+
+    def cleanup(self):
+        pass
+
+
+def _replay(monkeypatch, path, speed=1.0, max_speed=False):
+    renderer = _Capture()
+    monkeypatch.setattr(main, "_make_renderer", lambda args: renderer)
+    main._run_play(Namespace(
+        mode="replay", recording=str(path), speed=speed, max_speed=max_speed,
+        width=10, height=20, stats=False, stats_output="",
+    ))
+    game = renderer.game
+    return game.score, game.lines_cleared, game.row_masks, game.current_piece
+
+
+@pytest.mark.parametrize("evdev", (False, True))
+@pytest.mark.parametrize("seed", (1, 2))
+def test_replays_end_in_the_same_state(tmp_path, monkeypatch, seed, evdev):
+    path = tmp_path / "session.rec"
+    _record(path, _session(seed), seed, evdev)
+    fast = _replay(monkeypatch, path, max_speed=True)
+    assert any(fast[2]), "the session should have placed pieces"
+    assert _replay(monkeypatch, path, max_speed=True) == fast
+    # Real time, sped up to keep the test short, still follows the recorded clock
+    assert _replay(monkeypatch, path, speed=20.0) == fast
@@ -0,0 +1,191 @@
+"""SRS rotation conformance.
+
+The reference data below is copied from the SRS guideline on its own, not
+derived from tetris_led.game, so a wrong kick table or rotation state in
+the game shows up here.
+"""
+
+import random
+
+import pytest
+
+from tetris_led.game import Piece, _rotate_rows
+
+WIDTH, HEIGHT = 10, 20
+
+# Guideline kick tests as (x, y), y up; 0 = spawn, 1 = R, 2, 3 = L
+JLSTZ_KICKS = {
+    (0, 1): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
+    (1, 0): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],
+    (1, 2): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],
+    (2, 1): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
+    (2, 3): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],
+    (3, 2): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],
+    (3, 0): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],
+    (0, 3): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],
+}
+I_KICKS = {
+    (0, 1): [(0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)],
+    (1, 0): [(0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)],
+    (1, 2): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)],
+    (2, 1): [(0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)],
+    (2, 3): [(0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)],
+    (3, 2): [(0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)],
+    (3, 0): [(0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)],
+    (0, 3): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)],
+}
+
+# The O piece never kicks: every rotation keeps its cells
+O_KICKS = {(a, b): [(0, 0)] for a in range(4) for b in ((a + 1) % 4, (a - 1) % 4)}
+
+# Guideline rotation states as (row, col) cells within the rotation box.
+# This repo's "L" and "J" are named the other way round from the guideline,
+# so "L" holds the guideline J states and "J" the guideline L states.
+STATES = {
+    "T": [
+        {(0, 1), (1, 0), (1, 1), (1, 2)},
+        {(0, 1), (1, 1), (1, 2), (2, 1)},
+        {(1, 0), (1, 1), (1, 2), (2, 1)},
+        {(0, 1), (1, 0), (1, 1), (2, 1)},
+    ],
+    "I": [
+        {(1, 0), (1, 1), (1, 2), (1, 3)},
+        {(0, 2), (1, 2), (2, 2), (3, 2)},
+        {(2, 0), (2, 1), (2, 2), (2, 3)},
+        {(0, 1), (1, 1), (2, 1), (3, 1)},
+    ],
+    "L": [
+        {(0, 0), (1, 0), (1, 1), (1, 2)},
+        {(0, 1), (0, 2), (1, 1), (2, 1)},
+        {(1, 0), (1, 1), (1, 2), (2, 2)},
+        {(0, 1), (1, 1), (2, 0), (2, 1)},
+    ],
+    "J": [
+        {(0, 2), (1, 0), (1, 1), (1, 2)},
+        {(0, 1), (1, 1), (2, 1), (2, 2)},
+        {(1, 0), (1, 1), (1, 2), (2, 0)},
+        {(0, 0), (0, 1), (1, 1), (2, 1)},
+    ],
+    "S": [
+        {(0, 1), (0, 2), (1, 0), (1, 1)},
+        {(0, 1), (1, 1), (1, 2), (2, 2)},
+        {(1, 1), (1, 2), (2, 0), (2, 1)},
+        {(0, 0), (1, 0), (1, 1), (2, 1)},
+    ],
+    "Z": [
+        {(0, 0), (0, 1), (1, 1), (1, 2)},
+        {(0, 2), (1, 1), (1, 2), (2, 1)},
+        {(1, 0), (1, 1), (2, 1), (2, 2)},
+        {(0, 1), (1, 0), (1, 1), (2, 0)},
+    ],
+    "O": [{(0, 1), (0, 2), (1, 1), (1, 2)}] * 4,
+}
+
+
+def _piece_at(name, rotation, cells):
+    """The Piece in ``rotation`` that occupies exactly ``cells``."""
+    origin = Piece(name, 0, 0, rotation)
+    (r0, c0), (r1, c1) = min(cells), min(origin.cells)
+    piece = Piece(name, r0 - r1, c0 - c1, rotation)
+    assert set(piece.cells) == set(cells), f"{name} state {rotation} is not SRS-shaped"
+    return piece
+
+
+def _rows(filled):
+    rows = [0] * HEIGHT
+    for r, c in filled:
+        rows[r] |= 1 << c
+    return rows
+
+
+def _reference(rows, name, rotation, box, direction):
+    """Guideline rotation from the box position, on plain cell sets."""
+    end = (rotation + direction) % 4
+    table = {"I": I_KICKS, "O": O_KICKS}.get(name, JLSTZ_KICKS)
+    kicks = table[(rotation, end)]
+    for x, y in kicks:
+        cells = {(box[0] - y + r, box[1] + x + c) for r, c in STATES[name][end]}
+        if all(
+            0 <= c < WIDTH and r < HEIGHT and (r < 0 or not rows[r] >> c & 1)
+            for r, c in cells
+        ):
+            return cells
+    return None
+
+
+@pytest.mark.parametrize("name", sorted(STATES))
+@pytest.mark.parametrize("rotation", range(4))
+@pytest.mark.parametrize("direction", (1, -1))
+def test_matches_reference_on_random_boards(name, rotation, direction):
+    rng = random.Random(f"{name}{rotation}{direction}")
+    for _ in range(500):
+        box = (rng.randrange(0, HEIGHT - 3), rng.randrange(-1, WIDTH - 2))
+        cells = {(box[0] + r, box[1] + c) for r, c in STATES[name][rotation]}
+        if any(not 0 <= c < WIDTH for _, c in cells):
+            continue
+        density = rng.choice((0.3, 0.6, 0.85))
+        filled = {
+            (r, c) for r in range(HEIGHT) for c in range(WIDTH)
+            if rng.random() < density and (r, c) not in cells
+        }
+        rows = _rows(filled)
+        got = _rotate_rows(rows, WIDTH, HEIGHT, _piece_at(name, rotation, cells), direction)
+        want = _reference(rows, name, rotation, box, direction)
+        assert (set(got.cells) if got else None) == want
+
+
+def test_t_floor_kick():
+    # T resting flat on the floor: turning clockwise needs the (-1, +1) test
+    start = {(18, 4), (19, 3), (19, 4), (19, 5)}
+    got = _rotate_rows(_rows(()), WIDTH, HEIGHT, _piece_at("T", 0, start), 1)
+    assert set(got.cells) == {(17, 3), (18, 3), (18, 4), (19, 3)}
+
+
+def test_i_wall_kick():
+    # Vertical I against the left wall: L -> 0 takes the (+1, 0) test
+    start = {(5, 0), (6, 0), (7, 0), (8, 0)}
+    got = _rotate_rows(_rows(()), WIDTH, HEIGHT, _piece_at("I", 3, start), 1)
+    assert set(got.cells) == {(6, 0), (6, 1), (6, 2), (6, 3)}
+
+
+def test_i_kick_off_right_wall():
+    # Vertical I against the right wall: R -> 2 falls through to the (-1, 0) test
+    start = {(5, 9), (6, 9), (7, 9), (8, 9)}
+    got = _rotate_rows(_rows(()), WIDTH, HEIGHT, _piece_at("I", 1, start), 1)
+    assert set(got.cells) == {(7, 6), (7, 7), (7, 8), (7, 9)}
+
+
+def test_t_fifth_kick_test():
+    # Everything filled except the piece and a slot two rows down: only the
+    # last 0 -> L test, (+1, -2), fits
+    start = {(10, 4), (11, 3), (11, 4), (11, 5)}
+    target = {(12, 5), (13, 4), (13, 5), (14, 5)}
+    filled = {
+        (r, c) for r in range(HEIGHT) for c in range(WIDTH)
+        if (r, c) not in start | target
+    }
+    got = _rotate_rows(_rows(filled), WIDTH, HEIGHT, _piece_at("T", 0, start), -1)
+    assert set(got.cells) == target
+
+
+def test_o_rotation_keeps_cells():
+    start = {(18, 4), (18, 5), (19, 4), (19, 5)}
+    got = _rotate_rows(_rows(()), WIDTH, HEIGHT, _piece_at("O", 0, start), 1)
+    assert set(got.cells) == start and got.rotation == 1
+
+
+def test_s_state_two_sits_a_row_lower():
+    # S spawn -> 2 by two clockwise turns in open air: the flat state drops a row
+    start = {(5, 4), (5, 5), (6, 3), (6, 4)}
+    rows = _rows(())
+    piece = _rotate_rows(rows, WIDTH, HEIGHT, _piece_at("S", 0, start), 1)
+    piece = _rotate_rows(rows, WIDTH, HEIGHT, piece, 1)
+    assert set(piece.cells) == {(6, 4), (6, 5), (7, 3), (7, 4)}
+
+
+def test_blocked_rotation_leaves_piece():
+    start = {(10, 4), (11, 3), (11, 4), (11, 5)}
+    filled = {
+        (r, c) for r in range(HEIGHT) for c in range(WIDTH) if (r, c) not in start
+    }
+    assert _rotate_rows(_rows(filled), WIDTH, HEIGHT, _piece_at("T", 0, start), 1) is None